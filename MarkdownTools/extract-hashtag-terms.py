@@ -4,8 +4,8 @@ import yaml
 import argparse
 import sys
 from pathlib import Path
+from functools import lru_cache
 from itertools import islice
-from spellchecker import SpellChecker
 
 # Configuration
 # ZETTEL_ROOT = "/home/hittjw/Documents/GitHub/obsidian/Zettelkasten" # Ubuntu
@@ -24,8 +24,13 @@ WHITELIST = {
 RED_BG_WHITE_FG = "\033[41;37m"
 RESET = "\033[0m"
 
-spell = SpellChecker()
-spell.word_frequency.load_words([w.lower() for w in WHITELIST])
+@lru_cache(maxsize=None)
+def get_spell():
+    # Built on first use: loading the dictionary dominates startup, and --errors never needs it.
+    from spellchecker import SpellChecker
+    spell = SpellChecker()
+    spell.word_frequency.load_words([w.lower() for w in WHITELIST])
+    return spell
 
 def is_channel_hashtag(term):
     return 1 <= len(term) <= 3 and term.isupper() and term.isalpha()
@@ -44,6 +49,8 @@ def segment_words(text):
             suffix = segment_words(parts[1]) if parts[1] else ""
             return f"{prefix} {white_word} {suffix}".strip()
 
+    spell = get_spell()
+
     def solve(s):
         if not s: return []
         for i in range(len(s), 0, -1):
@@ -142,13 +149,44 @@ def process_files(file_list, error_only=False):
         
     return all_terms
 
+def process_index(db_path, root_dir, limit=None, error_only=False):
+    """Same results as process_files(), answered from the TidyObsidian SQLite vault index."""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'TidyObsidian'))
+    from vaultindex import open_index, iter_files, iter_tags
+
+    conn = open_index(db_path, root_dir)
+    files = list(islice(iter_files(conn), limit))
+    all_terms = set()
+    found_errors = 0
+
+    for rel_path, meta, _, yaml_error in files:
+        if yaml_error:
+            print(f"{RED_BG_WHITE_FG}YAML Error in file:{RESET} {os.path.join(root_dir, rel_path)}")
+            print(f"  Details: {yaml_error}")
+            found_errors += 1
+
+    if error_only:
+        conn.close()
+        if found_errors == 0:
+            print("No YAML formatting errors found.")
+        else:
+            print(f"\nTotal broken files found: {found_errors}")
+        sys.exit(0 if found_errors == 0 else 1)
+
+    paths = {rel_path for rel_path, *_ in files} if limit else None
+    for _, tag, _ in iter_tags(conn, paths):
+        norm = normalize_term(tag)
+        if norm: all_terms.add(re.sub(r'\s+', ' ', norm).strip())
+    conn.close()
+    return all_terms
+
 def check_spelling_with_color(term_list):
     flagged_output = []
     for term in term_list:
         if is_channel_hashtag(term) or is_catalog_code(term):
             continue
         words_to_check = term.split()
-        unknown = spell.unknown(words_to_check)
+        unknown = get_spell().unknown(words_to_check)
         if unknown:
             colored_words = [f"{RED_BG_WHITE_FG}{w}{RESET}" if w in unknown else w for w in words_to_check]
             flagged_output.append(" ".join(colored_words))
@@ -160,18 +198,21 @@ if __name__ == "__main__":
     parser.add_argument("--limit", type=int, default=None)
     parser.add_argument("--spellcheck", action="store_true")
     parser.add_argument("--errors", action="store_true", help="Only scan for formatting errors and exit")
+    parser.add_argument("--index", default=None, help="Answer from a TidyObsidian SQLite vault index instead of rescanning")
     args = parser.parse_args()
 
     if not os.path.isdir(args.directory):
         print(f"Error: {args.directory} not found")
         sys.exit(1)
 
-    files_gen = get_file_generator(args.directory)
-    if args.limit:
-        files_gen = islice(files_gen, args.limit)
-
-    # If --errors is passed, process_files will exit the script after the scan
-    results_raw = process_files(files_gen, error_only=args.errors)
+    # If --errors is passed, process_files/process_index will exit the script after the scan
+    if args.index:
+        results_raw = process_index(args.index, args.directory, args.limit, error_only=args.errors)
+    else:
+        files_gen = get_file_generator(args.directory)
+        if args.limit:
+            files_gen = islice(files_gen, args.limit)
+        results_raw = process_files(files_gen, error_only=args.errors)
     results = sorted(list(results_raw))
     
     if args.spellcheck:
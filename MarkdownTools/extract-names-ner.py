@@ -42,6 +42,11 @@ except Exception:
     print("spaCy is not installed. Please run: pip3 install spacy", file=sys.stderr)
     sys.exit(2)
 
+# Shared with the TidyObsidian tools. Only the split is used here: values are
+# hand-parsed below because templates hold `{{date}}`, which is not valid YAML.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'TidyObsidian'))
+from frontmatter import split_frontmatter
+
 
 # --------------------------------------------------------------------------- #
 # Lexicons
@@ -162,7 +167,6 @@ MAX_CHUNK = 100_000  # characters per document handed to spaCy
 # Markdown region handling
 # --------------------------------------------------------------------------- #
 
-FRONTMATTER_RE = re.compile(r"\A---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)", re.S)
 FM_KEY_RE = re.compile(r"^([A-Za-z_][\w -]*):[ \t]*(.*)$")
 FM_ITEM_RE = re.compile(r"^[ \t]+-[ \t]+(.+?)[ \t]*$")
 
@@ -180,14 +184,6 @@ TASKBOX_RE = re.compile(r"^[ \t]*[-*+][ \t]*\[[ xX/\->]\][ \t]*", re.M)
 LISTMARK_RE = re.compile(r"^[ \t]*(?:[-*+]|\d+\.)[ \t]+", re.M)
 
 
-def split_frontmatter(text):
-    """Return (frontmatter_body_or_None, rest_of_document)."""
-    m = FRONTMATTER_RE.match(text)
-    if not m:
-        return None, text
-    return m.group(1), text[m.end():]
-
-
 def unwrap_value(value):
     """Strip quoting and wikilink brackets from a frontmatter scalar.
 
@@ -14,23 +14,28 @@ Usage examples:
 
 import argparse
 import collections
+import functools
 import re
 import sys
 from typing import List, Tuple
 
-from nltk.corpus import stopwords
-
-# NLTK English stopwords
-NLTK_STOPWORDS = set(stopwords.words('english'))
-
 # Custom stopwords to append to NLTK list. Modify this for domain-specific filtering.
 CUSTOM_STOPWORDS = {
     # Add custom stopwords here, e.g.: 'word1', 'word2'
     'eof', 'hittjw', 'http', 'https', 'www', 'com', 'org', 'net', 'io', 'github', 'gitlab',
 }
 
-# Universal English stopwords (NLTK + custom)
-STOPWORDS = NLTK_STOPWORDS | CUSTOM_STOPWORDS
+
+@functools.lru_cache(maxsize=None)
+def get_stopwords() -> frozenset:
+    """Universal English stopwords (NLTK + custom), loaded on first use.
+
+    Importing NLTK and reading its corpus takes longer than most runs, so
+    `--help` and argument errors never pay for it.
+    """
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english')) | CUSTOM_STOPWORDS
+
 
 RE_CODEBLOCK = re.compile(r"```.*?```", re.S)
 RE_INLINE_CODE = re.compile(r"`[^`]*`")
@@ -115,9 +120,10 @@ def compute_ngrams(text: str, ngram_size: int = 3, min_nonstop: int = 2) -> Tupl
     ngrams = ngrams_from_tokens(tokens, ngram_size)
     counts = collections.Counter()
     contexts = {}
+    stop_words = get_stopwords()
     for ngram in ngrams:
         # Exclude any ngram containing a stopword or single-letter word
-        if not any(w in STOPWORDS for w in ngram) and not any(len(w) == 1 for w in ngram):
+        if not any(w in stop_words for w in ngram) and not any(len(w) == 1 for w in ngram):
             key = join_ngram(ngram)
             counts[key] += 1
     return counts, contexts
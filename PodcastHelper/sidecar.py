@@ -6,7 +6,9 @@ import os
 import random
 import re
 import shutil
+import sqlite3
 import subprocess
+import sys
 import threading
 import time
 from datetime import datetime
@@ -16,6 +18,9 @@ from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 from urllib.request import urlopen
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'TidyObsidian'))
+from frontmatter import read_frontmatter_tolerant
+
 DEFAULT_CONCURRENT_DOWNLOADS = 2
 DEFAULT_MAX_DELAY_SECONDS = 3
 NATIVE_TMPDIRS = ["TEMP", "TMP", "TMPDIR"]
@@ -82,7 +87,16 @@ def git_grep_files(root: Path, pattern: str) -> List[Path]:
     return [Path(root / line.strip()) for line in result.stdout.splitlines() if line.strip()]
 
 
-def git_grep_permalink(root: Path, permalink: str) -> Optional[Path]:
+def open_vault_index(root: Path, db_path: str) -> sqlite3.Connection:
+    from vaultindex import open_index
+    return open_index(db_path, str(root))
+
+
+def git_grep_permalink(root: Path, permalink: str, index: Optional[sqlite3.Connection] = None) -> Optional[Path]:
+    if index is not None:
+        from vaultindex import find_by_permalink
+        rel_path = find_by_permalink(index, permalink)
+        return Path(root / rel_path) if rel_path else None
     escaped_permalink = re.escape(permalink)
     pattern = f"^permalink:\\s*['\"]?{escaped_permalink}['\"]?\\s*$"
     
@@ -95,37 +109,16 @@ def git_grep_permalink(root: Path, permalink: str) -> Optional[Path]:
 
 
 def parse_yaml_front_matter(md_path: Path) -> Dict[str, object]:
-    metadata: Dict[str, object] = {}
     if not md_path.exists():
-        return metadata
-    with md_path.open('r', encoding='utf-8') as fh:
-        lines = fh.readlines()
-    if not lines or lines[0].strip() != '---':
-        return metadata
-    current_key: Optional[str] = None
-    for line in lines[1:]:
-        stripped = line.rstrip('\n')
-        if stripped.strip() == '---':
-            break
-        if stripped.lstrip().startswith('-') and current_key == 'tags':
-            current_value = stripped.lstrip()[1:].strip()
-            current_value = current_value.strip("'\"")
-            if current_value:
-                metadata.setdefault('tags', [])
-                metadata['tags'].append(current_value)
-            continue
-        if ':' not in stripped:
-            continue
-        key, _, value = stripped.partition(':')
-        key = key.strip()
-        value = value.strip().strip("'\"")
-        if key == 'tags':
-            metadata['tags'] = []
-            current_key = 'tags'
-        else:
-            metadata[key] = value
-            current_key = None
-    return metadata
+        return {}
+    try:
+        # Generated sidecars hold unquoted titles such as `Episode 12: The Return`,
+        # which are not valid YAML; those headers are read line by line instead.
+        metadata = read_frontmatter_tolerant(md_path)
+    except UnicodeDecodeError:
+        return {}
+    # Scalars come back as strings; empty keys as '' rather than None.
+    return {key: '' if value is None else value for key, value in metadata.items()}
 
 
 def get_tag_list(value: object) -> List[str]:
@@ -570,9 +563,16 @@ def extract_title_from_markdown(path: Path) -> str:
     return match.group(1).strip() if match else ''
 
 
-def gather_existing_sidecars(root: Path) -> List[Tuple[Path, Dict[str, object]]]:
-    candidates = git_grep_files(root, 'type: Podcast')
+def gather_existing_sidecars(root: Path, index: Optional[sqlite3.Connection] = None) -> List[Tuple[Path, Dict[str, object]]]:
     results: List[Tuple[Path, Dict[str, object]]] = []
+    if index is not None:
+        from vaultindex import files_of_type
+        for rel_path, metadata in files_of_type(index, 'podcast'):
+            if 'Template' in rel_path:
+                continue
+            results.append((Path(root / rel_path), metadata))
+        return results
+    candidates = git_grep_files(root, 'type: Podcast')
     for path in candidates:
         if 'Template' in str(path):
             continue
@@ -588,9 +588,9 @@ def truncate_for_report(text: str, width: int = 60) -> str:
     return text[:width - 3] + '...'
 
 
-def report_sidecars(root: Path) -> None:
+def report_sidecars(root: Path, index: Optional[sqlite3.Connection] = None) -> None:
     ensure_git_repo(root)
-    sidecars = gather_existing_sidecars(root)
+    sidecars = gather_existing_sidecars(root, index)
     if not sidecars:
         print_info('No podcast sidecar markdown files found.')
         return
@@ -649,6 +649,10 @@ def detect_conflicts(existing_metadata: Dict[str, object], rss_front: Dict[str,
 
 def update_markdown_sidecar(path: Path, rss_front: Dict[str, object], dry_run: bool) -> bool:
     metadata = parse_yaml_front_matter(path)
+    if not metadata:
+        # Rendering from an empty parse would drop every existing field
+        print_warning(f'Could not read front matter for {path}; not updating it')
+        return False
     updated_metadata, changes = build_update_plan(metadata, rss_front)
     if not changes:
         return False
@@ -713,13 +717,15 @@ def main() -> None:
     parser.add_argument('--report', action='store_true', help='Report existing podcast sidecars')
     parser.add_argument('--update', action='store_true', help='Update missing YAML front matter from RSS feed')
     parser.add_argument('--check-yaml', action='store_true', help='Dry-run conflict check between RSS and sidecar YAML')
+    parser.add_argument('--index', help='TidyObsidian SQLite vault index to answer lookups instead of git grep')
     args = parser.parse_args()
     root = (args.directory or Path.cwd()).resolve()
     if not root.exists() or not root.is_dir():
         raise SystemExit(f'Directory {root} does not exist.')
     ensure_git_repo(root)
+    index = open_vault_index(root, args.index) if args.index else None
     if args.report:
-        report_sidecars(root)
+        report_sidecars(root, index)
         if not args.rss_feed:
             return
     if args.check_yaml and not args.rss_feed:
@@ -738,7 +744,7 @@ def main() -> None:
             print_info('Checking YAML conflicts...')
             conflicts_found = 0
             for rss_item in rss_items:
-                path = git_grep_permalink(root, rss_item['link'])
+                path = git_grep_permalink(root, rss_item['link'], index)
                 if not path:
                     continue
                 _, front = build_front_matter(rss_item, channel_title)
@@ -756,7 +762,7 @@ def main() -> None:
             print_info('Updating existing sidecars...')
             updated_count = 0
             for rss_item in rss_items:
-                path = git_grep_permalink(root, rss_item['link'])
+                path = git_grep_permalink(root, rss_item['link'], index)
                 if not path:
                     continue
                 _, front = build_front_matter(rss_item, channel_title)
@@ -778,7 +784,7 @@ def main() -> None:
             permalink = rss_item.get('link', '').strip()
             if not permalink:
                 continue
-            if permalink in seen_permalinks or git_grep_permalink(root, permalink):
+            if permalink in seen_permalinks or git_grep_permalink(root, permalink, index):
                 continue
             seen_permalinks.add(permalink)
             print_info(f'Processing episode: {rss_item.get("title", "<no title>")}')
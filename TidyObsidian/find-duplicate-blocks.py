@@ -4,15 +4,23 @@ High-performance duplicate / near-duplicate Markdown scanner.
 
 Features:
 - Whole-file hashing to skip redundant block comparisons.
-- Multiprocessing for file reading/filtering/hashing and block extraction.
+- Rabin-Karp rolling hash over line hashes to find exact duplicate blocks first.
+- Multiprocessing for file reading/filtering/hashing, block fingerprinting and matching.
 - Token-based Jaccard similarity for fast near-duplicate detection.
-- Inverted index on signature tokens to aggressively prune comparisons.
+- MinHash signatures with banded LSH buckets to prune candidate comparisons.
+- LSH buckets sharded across workers, merged deterministically with union-find.
 - Optional --ignore-wikilink flag to strip wikilinks and drop low-value lines.
+- Optional --cache index so reruns only re-read files whose mtime/size changed.
+- Optional --stream mode: workers return fingerprints only, text is re-read on demand, file by file.
 """
 
+import functools
+import os
+import pickle
 import subprocess
 import sys
 import hashlib
+import random
 import re
 import argparse
 from collections import defaultdict
@@ -21,24 +29,30 @@ from multiprocessing import Pool, cpu_count
 # ---------------- CONFIGURATION ----------------
 BLOCK_SIZE = 5                  # lines per block
 SIMILARITY_THRESHOLD = 0.9      # Jaccard token similarity
-SIGNATURE_TOKENS_PER_BLOCK = 3  # how many tokens to index per block
+MINHASH_PERMUTATIONS = 64       # MinHash signature length per block
+MINHASH_SEED = 1                # fixed seed so signatures are stable across runs
+ROLLING_HASH_BASE = 1_000_003   # Rabin-Karp base over per-line hashes
 LENGTH_RATIO_TOLERANCE = 0.3    # +/- 30% length window for candidates
+SHARDS_PER_WORKER = 4           # LSH bucket shards handed to each matching worker
+STREAM_LINE_CACHE_FILES = 256   # filtered files each worker keeps in --stream mode
 LOW_VALUE_LINE_THRESHOLD = 20   # drop lines shorter than this after wikilink removal
+DEFAULT_CACHE_FILE = ".find-duplicate-blocks.cache"  # block index, relative to vault root
+CACHE_VERSION = 4               # bump when the cached block format changes
 # ------------------------------------------------
 
-from nltk.corpus import stopwords
-
-# NLTK English stopwords
-NLTK_STOPWORDS = set(stopwords.words('english'))
-
 # Custom stopwords to append to NLTK list. Modify this for domain-specific filtering.
 CUSTOM_STOPWORDS = {
     # Add custom stopwords here, e.g.: 'word1', 'word2'
     'eof', 'hittjw', 'http', 'https', 'www', 'com', 'org', 'net', 'io', 'github', 'gitlab',
 }
 
-# Universal English stopwords (NLTK + custom)
-STOPWORDS = NLTK_STOPWORDS | CUSTOM_STOPWORDS
+
+@functools.lru_cache(maxsize=None)
+def get_stopwords():
+    """Universal English stopwords (NLTK + custom), loaded on first use so --help stays fast."""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english')) | CUSTOM_STOPWORDS
+
 
 WORD_RE = re.compile(r"\w+")
 WIKILINK_RE = re.compile(r"\[\[.*?\]\]")
@@ -116,47 +130,330 @@ def jaccard(tokens_a, tokens_b, len_a=None, len_b=None):
     return inter / union
 
 
-def select_signature_tokens(tokens):
-    """Hash-based selection of signature tokens (more selective than lexicographic)."""
-    if not tokens:
-        return []
-    # Stable hash: sha1 of token text, then sort by that value
-    # This approximates MinHash but stays simple and deterministic.
-    hashed = [
-        (hashlib.sha1(tok.encode("utf-8")).hexdigest(), tok)
-        for tok in tokens
-        if tok not in STOPWORDS  # skip very common / low-value tokens
-    ]
-    if not hashed:
+# MinHash permutations h(x) = (a * x + b) mod p, truncated to 32 bits.
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+_perm_rng = random.Random(MINHASH_SEED)
+MINHASH_PERMS = [
+    (_perm_rng.randint(1, MERSENNE_PRIME - 1), _perm_rng.randint(0, MERSENNE_PRIME - 1))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+# Per-process cache: token -> its value under every permutation.
+_token_minhash_cache = {}
+
+
+def token_minhash(tok):
+    """Hash a token under every MinHash permutation (cached per process)."""
+    vector = _token_minhash_cache.get(tok)
+    if vector is None:
+        # Stable 64-bit base hash; Python's hash() is salted per process.
+        h = int.from_bytes(hashlib.blake2b(tok.encode("utf-8"), digest_size=8).digest(), "big")
+        vector = tuple(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for a, b in MINHASH_PERMS)
+        _token_minhash_cache[tok] = vector
+    return vector
+
+
+def merge_signatures(signatures):
+    """Element-wise minimum of MinHash signatures, i.e. the signature of the union."""
+    signatures = [sig for sig in signatures if sig]
+    if not signatures:
+        return ()
+    if len(signatures) == 1:
+        return signatures[0]
+    return tuple(map(min, *signatures))
+
+
+def minhash_signature(tokens):
+    """MinHash signature over the non-stopword tokens of a block.
+
+    Returns an empty tuple when every token is a stopword.
+    """
+    stop_words = get_stopwords()
+    return merge_signatures(token_minhash(tok) for tok in tokens if tok not in stop_words)
+
+
+def _integrate(f, lower, upper, steps=100):
+    """Trapezoid rule, enough precision for choosing LSH parameters."""
+    width = (upper - lower) / steps
+    total = 0.5 * (f(lower) + f(upper))
+    for i in range(1, steps):
+        total += f(lower + i * width)
+    return total * width
+
+
+def lsh_params(threshold, num_perm, fp_weight=0.5, fn_weight=0.5):
+    """Map a Jaccard threshold onto (bands, rows) for banded LSH.
+
+    Two blocks with similarity s share at least one bucket with probability
+    1 - (1 - s^rows)^bands. Pick the split of num_perm that minimises the
+    weighted area of false positives (s < threshold) plus false negatives
+    (s >= threshold) under that S-curve.
+    """
+    best = (1, num_perm)
+    best_error = float("inf")
+    for bands in range(1, num_perm + 1):
+        max_rows = num_perm // bands
+        for rows in range(1, max_rows + 1):
+            fp = _integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+            fn = _integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+            error = fp_weight * fp + fn_weight * fn
+            if error < best_error:
+                best_error = error
+                best = (bands, rows)
+    return best
+
+
+def lsh_band_keys(signature, bands, rows):
+    """Split a MinHash signature into one bucket hash per band (band = position)."""
+    if not signature:
+        return ()
+    return tuple(
+        hash(signature[band * rows : (band + 1) * rows])
+        for band in range(bands)
+    )
+
+
+def read_filtered_lines(file_path, ignore_wikilink):
+    """Read a file and return its filtered lines."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        raw = f.readlines()
+    return filter_lines(raw, ignore_wikilink)
+
+
+@functools.lru_cache(maxsize=STREAM_LINE_CACHE_FILES)
+def cached_filtered_lines(file_path, ignore_wikilink):
+    """Re-read filtered lines on demand, keeping only a few files per process.
+
+    Callers ask for one file's blocks together (see match_shard), so the cache
+    only has to bridge neighbouring requests, not a whole shard.
+    """
+    try:
+        return read_filtered_lines(file_path, ignore_wikilink)
+    except Exception as e:
+        print(f"Warning: Could not re-read {file_path}: {e}")
         return []
-    hashed.sort(key=lambda x: x[0])
-    return [tok for _, tok in hashed[:SIGNATURE_TOKENS_PER_BLOCK]]
 
 
+def hash_lines(lines):
+    """Whole-file hash of filtered lines."""
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
 
 def read_and_hash_file(args):
     """Read file, filter it, and return (file_path, filtered_lines, sha256_hash)."""
     file_path, ignore_wikilink = args
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw = f.readlines()
-        lines = filter_lines(raw, ignore_wikilink)
-        joined = "\n".join(lines)
-        h = hashlib.sha256(joined.encode("utf-8")).hexdigest()
-        return (file_path, lines, h)
+        lines = read_filtered_lines(file_path, ignore_wikilink)
+        return (file_path, lines, hash_lines(lines))
     except Exception as e:
         print(f"Warning: Could not read {file_path}: {e}")
         return (file_path, [], None)
 
 
-def extract_blocks(args):
-    """Extract blocks (file_path, block_text, line_num) from filtered lines."""
-    file_path, lines, block_size = args
-    blocks = []
+def scan_file_fingerprints(args):
+    """Streaming worker: read, filter, hash and fingerprint a file in one pass.
+
+    Returns (file_id, sha256_hash, window_hashes, band_keys); the filtered
+    text stays in the worker.
+    """
+    file_id, file_path, ignore_wikilink, block_size, bands, rows = args
+    try:
+        lines = read_filtered_lines(file_path, ignore_wikilink)
+    except Exception as e:
+        print(f"Warning: Could not read {file_path}: {e}")
+        return (file_id, None, [], [])
+    window_hashes, band_keys = fingerprint_blocks((file_path, lines, block_size, bands, rows))
+    return (file_id, hash_lines(lines), window_hashes, band_keys)
+
+
+def line_hash(line):
+    """Stable 64-bit hash of one filtered line."""
+    return int.from_bytes(hashlib.blake2b(line.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def rolling_block_hashes(lines, block_size):
+    """Rabin-Karp hash of every window of block_size lines, without joining them.
+
+    Each window hash is sum(h[i + j] * BASE^(block_size - 1 - j)) mod p over the
+    per-line hashes; the next window is derived from the previous one in O(1).
+    """
+    count = len(lines) - block_size + 1
+    if count <= 0:
+        return []
+    hashes = [line_hash(line) % MERSENNE_PRIME for line in lines]
+    lead = pow(ROLLING_HASH_BASE, block_size - 1, MERSENNE_PRIME)
+    h = 0
+    for value in hashes[:block_size]:
+        h = (h * ROLLING_HASH_BASE + value) % MERSENNE_PRIME
+    window_hashes = [h]
+    for i in range(1, count):
+        h = (h - hashes[i - 1] * lead) % MERSENNE_PRIME
+        h = (h * ROLLING_HASH_BASE + hashes[i + block_size - 1]) % MERSENNE_PRIME
+        window_hashes.append(h)
+    return window_hashes
+
+
+def fingerprint_blocks(args):
+    """Fingerprint every block of a file as (window_hashes, band_keys).
+
+    Runs in the pool. No block text is joined: each line is tokenized and
+    MinHashed once, and a block's signature is the merge of its line signatures.
+    """
+    file_path, lines, block_size, bands, rows = args
+    line_tokens = [tokenize(line) for line in lines]
+    line_signatures = [minhash_signature(tokens) for tokens in line_tokens]
+    band_keys = []
     for i in range(len(lines) - block_size + 1):
-        block = "\n".join(lines[i : i + block_size])
-        blocks.append((file_path, block, i + 1))
-    return blocks
+        signature = merge_signatures(line_signatures[i : i + block_size])
+        band_keys.append(lsh_band_keys(signature, bands, rows))
+    return rolling_block_hashes(lines, block_size), band_keys
+
+
+def materialize_block(lines, line_num, block_size):
+    """Materialise the text of the block starting at 1-based line_num."""
+    return "\n".join(lines[line_num - 1 : line_num - 1 + block_size])
+
+
+def file_stat_key(file_path):
+    """Cheap change detector for a file: (mtime_ns, size), or None if missing."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_block_cache(cache_path, params):
+    """Load the per-file block index, discarding it if scan parameters changed."""
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable cache {cache_path}: {e}")
+        return {}
+    if cache.get("version") != CACHE_VERSION or cache.get("params") != params:
+        print("Cache parameters changed; rebuilding block index.")
+        return {}
+    return cache.get("files", {})
+
+
+def save_block_cache(cache_path, params, entries):
+    """Write the block index atomically so an interrupted run never corrupts it."""
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                {"version": CACHE_VERSION, "params": params, "files": entries},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Warning: Could not write cache {cache_path}: {e}")
+
+
+# Per-worker state for the matching phase, set by init_match_worker().
+_match_state = {}
+
+
+def init_match_worker(file_lines, blocks, block_size, similarity_threshold, ignore_wikilink):
+    """Pool initializer: share filtered lines and block locations with a matcher.
+
+    file_lines may be partial (or empty in --stream mode); missing files are
+    re-read from disk through cached_filtered_lines(), once per shard.
+    """
+    _match_state["file_lines"] = file_lines
+    _match_state["blocks"] = blocks
+    _match_state["block_size"] = block_size
+    _match_state["threshold"] = similarity_threshold
+    _match_state["ignore_wikilink"] = ignore_wikilink
+
+
+def lines_for(file_lines, file_path, ignore_wikilink):
+    """Filtered lines for a file, from memory when held, otherwise from disk."""
+    lines = file_lines.get(file_path)
+    if lines is None:
+        lines = cached_filtered_lines(file_path, ignore_wikilink)
+    return lines
+
+
+def match_shard(buckets):
+    """Greedy canonical matching inside each LSH bucket of one shard.
+
+    Blocks in a bucket are visited in block-id order and compared against the
+    bucket's canonical blocks (length window, then Jaccard). Returns the
+    (block_id, canonical_id) edges that passed, for the parent to union.
+    """
+    file_lines = _match_state["file_lines"]
+    blocks = _match_state["blocks"]
+    block_size = _match_state["block_size"]
+    threshold = _match_state["threshold"]
+    ignore_wikilink = _match_state["ignore_wikilink"]
+
+    # Features for every block in the shard, built file by file so each file is
+    # read once per shard however many files the shard spans
+    by_file = defaultdict(list)
+    for block_id in {block_id for ids in buckets for block_id in ids}:
+        by_file[blocks[block_id][0]].append(block_id)
+    features = {}
+    for file_path in sorted(by_file):
+        lines = lines_for(file_lines, file_path, ignore_wikilink)
+        for block_id in by_file[file_path]:
+            text = materialize_block(lines, blocks[block_id][1], block_size)
+            tokens = tokenize(text)
+            features[block_id] = (tokens, len(tokens), len(text))
+
+    edges = []
+    for ids in buckets:
+        canonicals = []
+        for block_id in ids:
+            tokens, token_count, length = features[block_id]
+            if not tokens:
+                continue
+
+            matched = False
+            for canonical_id in canonicals:
+                cb_tokens, cb_count, cb_length = features[canonical_id]
+
+                # Quick length ratio filter (same as before).
+                longer = max(cb_length, length)
+                if longer == 0:
+                    continue
+                if (longer - min(cb_length, length)) / longer > LENGTH_RATIO_TOLERANCE:
+                    continue
+
+                # Faster Jaccard using cached token counts.
+                if jaccard(tokens, cb_tokens, token_count, cb_count) >= threshold:
+                    edges.append((block_id, canonical_id))
+                    matched = True
+                    break
+
+            if not matched:
+                canonicals.append(block_id)
+    return edges
+
+
+def shard_buckets(buckets, shard_count):
+    """Split candidate buckets into shards of similar total size, deterministically."""
+    shards = [[] for _ in range(shard_count)]
+    loads = [0] * shard_count
+    for ids in sorted(buckets, key=lambda ids: (-len(ids), ids[0])):
+        target = loads.index(min(loads))
+        shards[target].append(ids)
+        loads[target] += len(ids) * len(ids)
+    return [shard for shard in shards if shard]
+
+
+def find_root(parent, node):
+    """Union-find lookup with path halving."""
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
 
 
 def effective_cpu_count():
@@ -181,18 +478,62 @@ def find_duplicates(
     similarity_threshold,
     ignore_wikilink=False,
     short_line_threshold=20,
+    cache_path=None,
+    stream=False,
 ):
     worker_count = effective_cpu_count()
     print(f"Using up to {worker_count} CPU workers for parallel scanning...\n")
 
-    # Step 1: Parallel read + filter + hash
+    bands, rows = lsh_params(similarity_threshold, MINHASH_PERMUTATIONS)
+    get_stopwords()  # load once here so forked workers inherit it
+
+    # Step 0: Load the block index and split files into unchanged / changed
+    cache_params = (ignore_wikilink, block_size, MINHASH_PERMUTATIONS, MINHASH_SEED,
+                    bands, rows, sys.version_info[:2])
+    cached = load_block_cache(cache_path, cache_params) if cache_path else {}
+    # Cached per file: stat key, content hash, window hashes and band keys; never the text
+    entries = {}
+    # Filtered text of files read this run (not --stream); everything else is re-read on demand
+    file_lines = {}
+    stale_files = []
+    for f in files:
+        stat_key = file_stat_key(f)
+        entry = cached.get(f)
+        if entry is not None and stat_key is not None and entry["stat"] == stat_key:
+            entries[f] = entry
+        else:
+            stale_files.append((f, stat_key))
+    if cache_path:
+        print(f"Block index: {len(entries)} unchanged, {len(stale_files)} new or changed files.")
+
+    # Step 1: Parallel read + filter + hash (changed files only)
     print("Hashing files in parallel...")
-    with Pool(processes=worker_count) as pool:
-        results = pool.map(read_and_hash_file, [(f, ignore_wikilink) for f in files])
+    if stream:
+        # Workers fingerprint every block up front and send back no text.
+        scan_args = (
+            (file_id, f, ignore_wikilink, block_size, bands, rows)
+            for file_id, (f, _) in enumerate(stale_files)
+        )
+        chunksize = max(1, len(stale_files) // (worker_count * 16))
+        with Pool(processes=worker_count) as pool:
+            for file_id, h, window_hashes, band_keys in pool.imap_unordered(
+                scan_file_fingerprints, scan_args, chunksize=chunksize
+            ):
+                f, stat_key = stale_files[file_id]
+                entries[f] = {"stat": stat_key, "hash": h,
+                              "window_hashes": window_hashes, "band_keys": band_keys}
+    else:
+        with Pool(processes=worker_count) as pool:
+            results = pool.map(read_and_hash_file, [(f, ignore_wikilink) for f, _ in stale_files])
+
+        for (f, lines, h), (_, stat_key) in zip(results, stale_files):
+            entries[f] = {"stat": stat_key, "hash": h,
+                          "window_hashes": None, "band_keys": None}
+            file_lines[f] = lines
 
-    file_contents = {f: lines for f, lines, h in results}
     file_hashes = defaultdict(list)
-    for f, lines, h in results:
+    for f in files:
+        h = entries[f]["hash"]
         if h:
             file_hashes[h].append(f)
 
@@ -211,86 +552,94 @@ def find_duplicates(
     unique_files = [f for h, flist in file_hashes.items() if len(flist) == 1 for f in flist]
     print(f"Proceeding with block-level scanning on {len(unique_files)} unique files...\n")
 
-    # Step 4: Parallel block extraction
-    block_args = [(f, file_contents[f], block_size) for f in unique_files]
+    # Step 4: Parallel block fingerprinting for files without cached fingerprints
+    block_args = [
+        (f, lines_for(file_lines, f, ignore_wikilink), block_size, bands, rows)
+        for f in unique_files
+        if entries[f]["band_keys"] is None
+    ]
     with Pool(processes=worker_count) as pool:
-        block_results = pool.map(extract_blocks, block_args)
+        block_results = pool.map(fingerprint_blocks, block_args)
+
+    for (file_path, *_), (window_hashes, band_keys) in zip(block_args, block_results):
+        entries[file_path]["window_hashes"] = window_hashes
+        entries[file_path]["band_keys"] = band_keys
+
+    if cache_path:
+        save_block_cache(cache_path, cache_params, entries)
+
+    block_count = sum(len(entries[f]["window_hashes"]) for f in unique_files)
+    print(f"Collected {block_count} blocks from unique files.\n")
+
+    # Step 5a: Exact block duplicates via rolling hash, no block text needed
+    exact_index = defaultdict(list)
+    for f in unique_files:
+        for i, h in enumerate(entries[f]["window_hashes"]):
+            exact_index[h].append((f, i + 1))
+
+    # Every exact group sends one representative (carrying all its locations)
+    # to the fuzzy stage so near-duplicates can still join the cluster.
+    representatives = {}
+    skipped = set()
+    exact_groups = 0
+    for locations in exact_index.values():
+        if len(locations) > 1 and len({f for f, _ in locations}) > 1:
+            exact_groups += 1
+            representatives[locations[0]] = locations[1:]
+            skipped.update(locations[1:])
+    del exact_index
+    print(f"Exact stage: {exact_groups} duplicate blocks, {len(skipped)} blocks need no fuzzy check.\n")
+
+    # Step 5b: MinHash/LSH candidate generation + Jaccard verification on the remainder
+    print(f"LSH banding: {bands} bands x {rows} rows for threshold {similarity_threshold}\n")
 
-    all_blocks = [item for sublist in block_results for item in sublist]
-    print(f"Collected {len(all_blocks)} blocks from unique files.\n")
-
-        # Step 5: Aggressive, indexed block-level duplicate detection
-    canonical_blocks = []
-    token_index = defaultdict(set)
-
-    for file_path, block_text, line_num in all_blocks:
-        tokens = tokenize(block_text)
-        if not tokens:
-            continue
-
-        length = len(block_text)
-        token_count = len(tokens)
-        sig_tokens = select_signature_tokens(tokens)
-
-        # If we have no signature tokens (e.g., all stopwords), just treat as its own canonical block.
-        if not sig_tokens:
-            cb_idx = len(canonical_blocks)
-            canonical_blocks.append(
-                {
-                    "text": block_text,
-                    "tokens": tokens,
-                    "token_count": token_count,
-                    "length": length,
-                    "locations": [(file_path, line_num)],
-                }
-            )
-            continue
-
-        # Collect candidate canonical block indices via inverted index.
-        candidate_indices = set()
-        for t in sig_tokens:
-            candidate_indices.update(token_index.get(t, ()))
-
-        matched = False
-        for idx in candidate_indices:
-            cb = canonical_blocks[idx]
-
-            # Quick length ratio filter (same as before).
-            shorter = min(cb["length"], length)
-            longer = max(cb["length"], length)
-            if longer == 0:
-                continue
-            if (longer - shorter) / longer > LENGTH_RATIO_TOLERANCE:
+    blocks = []
+    lsh_buckets = defaultdict(list)
+    for f in unique_files:
+        for i, keys in enumerate(entries[f]["band_keys"]):
+            location = (f, i + 1)
+            if location in skipped:
                 continue
-
-            # Faster Jaccard using cached token counts.
-            sim = jaccard(tokens, cb["tokens"], token_count, cb["token_count"])
-            if sim >= similarity_threshold:
-                cb["locations"].append((file_path, line_num))
-                matched = True
-                break
-
-        if not matched:
-            cb_idx = len(canonical_blocks)
-            canonical_blocks.append(
-                {
-                    "text": block_text,
-                    "tokens": tokens,
-                    "token_count": token_count,
-                    "length": length,
-                    "locations": [(file_path, line_num)],
-                }
-            )
-            for t in sig_tokens:
-                token_index[t].add(cb_idx)
-
-
-    # Step 6: Keep only blocks appearing in >1 file
+            block_id = len(blocks)
+            blocks.append(location)
+            for band, key in enumerate(keys):
+                lsh_buckets[(band, key)].append(block_id)
+
+    candidate_buckets = [ids for ids in lsh_buckets.values() if len(ids) > 1]
+    del lsh_buckets
+    shards = shard_buckets(candidate_buckets, worker_count * SHARDS_PER_WORKER)
+    print(f"Matching {len(candidate_buckets)} candidate buckets in {len(shards)} shards...\n")
+
+    file_lines = {f: file_lines[f] for f in unique_files if f in file_lines}
+    parent = list(range(len(blocks)))
+    with Pool(
+        processes=worker_count,
+        initializer=init_match_worker,
+        initargs=(file_lines, blocks, block_size, similarity_threshold, ignore_wikilink),
+    ) as pool:
+        for edges in pool.imap_unordered(match_shard, shards):
+            for a, b in edges:
+                root_a, root_b = find_root(parent, a), find_root(parent, b)
+                if root_a != root_b:
+                    # Smallest block id wins, so the merge is order-independent.
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = defaultdict(list)
+    for block_id in range(len(blocks)):
+        clusters[find_root(parent, block_id)].append(block_id)
+
+    # Step 6: Keep only blocks appearing in >1 file; text is loaded only for these
     duplicates = []
-    for cb in canonical_blocks:
-        files_for_block = {f for f, _ in cb["locations"]}
+    for root in sorted(clusters):
+        locations = []
+        for block_id in clusters[root]:
+            locations.append(blocks[block_id])
+            locations.extend(representatives.get(blocks[block_id], ()))
+        files_for_block = {f for f, _ in locations}
         if len(files_for_block) > 1:
-            duplicates.append((cb["text"], cb["locations"]))
+            file_path, line_num = blocks[root]
+            lines = lines_for(file_lines, file_path, ignore_wikilink)
+            duplicates.append((materialize_block(lines, line_num, block_size), locations))
 
     return whole_file_dupes, duplicates
 
@@ -308,6 +657,18 @@ def main():
         action="store_true",
         help="Strip wikilinks [[...]] and drop low-value lines (<20 chars)",
     )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_FILE,
+        default=None,
+        help=f"Keep a block index between runs; only changed files are re-read (default file: {DEFAULT_CACHE_FILE})",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Keep note text out of memory: workers return block fingerprints only, text is re-read file by file for matching",
+    )
     args = parser.parse_args()
 
     files = get_markdown_files()
@@ -322,6 +683,8 @@ def main():
         SIMILARITY_THRESHOLD,
         ignore_wikilink=args.ignore_wikilink,
         short_line_threshold=args.ignore_short_lines,
+        cache_path=args.cache,
+        stream=args.stream,
     )
 
 
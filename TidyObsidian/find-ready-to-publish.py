@@ -11,15 +11,16 @@ Usage:
   python3 find-ready-to-publish.py . --min-words 400 --max-words 2500
   python3 find-ready-to-publish.py . --yaml-type article
   python3 find-ready-to-publish.py . --verbose  # Show all errors with filenames
+  python3 find-ready-to-publish.py . --index /tmp/vault.sqlite  # Pre-filter from the vault index
 """
 
 import os
 import sys
 import re
 import argparse
-import yaml
-import pandas as pd
 from collections import defaultdict
+from frontmatter import FrontmatterError, load_frontmatter
+from vaultscan import iter_vault
 
 
 def parse_yaml_front_matter(text):
@@ -28,20 +29,9 @@ def parse_yaml_front_matter(text):
     Returns (yaml_dict, body_text) or ({}, text) if no front matter.
     Ensures meta is always a dict, never a string or other type.
     """
-    yaml_pattern = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
-    match = yaml_pattern.search(text)
-    
-    if not match:
-        return {}, text
-    
     try:
-        meta = yaml.safe_load(match.group(1))
-        body = yaml_pattern.sub('', text)
-        # Ensure meta is a dict; if YAML parsed to a string or other type, return empty dict
-        if not isinstance(meta, dict):
-            meta = {}
-        return meta, body
-    except Exception:
+        return load_frontmatter(text)
+    except FrontmatterError:
         return {}, text
 
 
@@ -149,7 +139,33 @@ def score_completeness(meta, body_text, word_count):
     return min(100, int(score))
 
 
-def scan_directory(root_dir, min_words=400, max_words=2500, yaml_type=None, verbose=False):
+def indexed_candidates(index_path, root_dir, min_words, max_words, yaml_type=None):
+    """Return paths that pass the publish/word-count/type filters according to the vault index.
+    
+    Only these files are read from disk for scoring.
+    """
+    from vaultindex import open_index, iter_files
+    conn = open_index(index_path, root_dir)
+    rows = list(iter_files(conn))
+    conn.close()
+
+    candidates = []
+    for rel_path, meta, word_count, _ in rows:
+        if is_published(meta):
+            continue
+        if word_count < min_words or word_count > max_words:
+            continue
+        if yaml_type:
+            doc_type = meta.get('type', '')
+            if isinstance(doc_type, list):
+                doc_type = doc_type[0] if doc_type else ''
+            if str(doc_type).lower() != yaml_type.lower():
+                continue
+        candidates.append(os.path.join(root_dir, rel_path))
+    return candidates
+
+
+def scan_directory(root_dir, min_words=400, max_words=2500, yaml_type=None, verbose=False, index_path=None):
     """Scan directory for markdown candidates.
     
     Args:
@@ -158,88 +174,86 @@ def scan_directory(root_dir, min_words=400, max_words=2500, yaml_type=None, verb
         max_words: Maximum word count
         yaml_type: Optional YAML type filter (case-insensitive)
         verbose: Show errors and skipped files
+        index_path: Optional SQLite vault index used to skip non-candidates without reading them
     
     Returns pandas DataFrame with candidate articles and scores.
     """
     records = []
     errors = []
     
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        # Skip hidden directories (starting with .)
-        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+    if index_path:
+        candidates = indexed_candidates(index_path, root_dir, min_words, max_words, yaml_type)
+    else:
+        # Hidden files/directories and Templates are pruned by the shared scanner
+        candidates = (path for path, _ in iter_vault(root_dir, extensions=('.md',)))
+
+    for full_path in candidates:
+        try:
+            with open(full_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            error_msg = f"[FILE READ ERROR] {full_path}: {str(e)}"
+            errors.append(error_msg)
+            if verbose:
+                print(error_msg)
+            continue
         
-        for fname in filenames:
-            # Skip hidden files and non-markdown files
-            if fname.startswith('.') or not fname.lower().endswith('.md'):
-                continue
+        try:
+            meta, body = parse_yaml_front_matter(content)
+            word_count = count_words(body)
             
-            full_path = os.path.join(dirpath, fname)
+            # Filter: skip published, filter by word count
+            if is_published(meta):
+                continue
             
-            try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            except Exception as e:
-                error_msg = f"[FILE READ ERROR] {full_path}: {str(e)}"
-                errors.append(error_msg)
-                if verbose:
-                    print(error_msg)
+            if word_count < min_words or word_count > max_words:
                 continue
             
-            try:
-                meta, body = parse_yaml_front_matter(content)
-                word_count = count_words(body)
-                
-                # Filter: skip published, filter by word count
-                if is_published(meta):
-                    continue
-                
-                if word_count < min_words or word_count > max_words:
-                    continue
-                
-                # Filter: yaml type (case-insensitive)
-                if yaml_type:
-                    doc_type = meta.get('type', '')
-                    if isinstance(doc_type, list):
-                        doc_type = doc_type[0] if doc_type else ''
-                    doc_type = str(doc_type).lower()
-                    if doc_type != yaml_type.lower():
-                        continue
-                
-                # Score the candidate
-                completeness = score_completeness(meta, body, word_count)
-                
-                # Normalize type and status from potential list to string
-                doc_type = meta.get('type', 'Unknown')
+            # Filter: yaml type (case-insensitive)
+            if yaml_type:
+                doc_type = meta.get('type', '')
                 if isinstance(doc_type, list):
-                    doc_type = doc_type[0] if doc_type else 'Unknown'
-                doc_type = str(doc_type)
-                
-                doc_status = meta.get('status', 'Draft')
-                if isinstance(doc_status, list):
-                    doc_status = doc_status[0] if doc_status else 'Draft'
-                doc_status = str(doc_status)
-                
-                record = {
-                    'file': full_path,
-                    'title': meta.get('title', ''),
-                    'type': doc_type,
-                    'status': doc_status,
-                    'word_count': word_count,
-                    'readability': calculate_readability_score(body),
-                    'completeness': completeness,
-                    'yaml_complete': bool(meta.get('title') and meta.get('tags')),
-                }
-                
-                records.append(record)
-                
-            except Exception as e:
-                error_msg = f"[PARSE ERROR] {full_path}: {str(e)}"
-                errors.append(error_msg)
-                if verbose:
-                    print(error_msg)
-                continue
-    
-    # Convert to DataFrame
+                    doc_type = doc_type[0] if doc_type else ''
+                doc_type = str(doc_type).lower()
+                if doc_type != yaml_type.lower():
+                    continue
+            
+            # Score the candidate
+            completeness = score_completeness(meta, body, word_count)
+            
+            # Normalize type and status from potential list to string
+            doc_type = meta.get('type', 'Unknown')
+            if isinstance(doc_type, list):
+                doc_type = doc_type[0] if doc_type else 'Unknown'
+            doc_type = str(doc_type)
+            
+            doc_status = meta.get('status', 'Draft')
+            if isinstance(doc_status, list):
+                doc_status = doc_status[0] if doc_status else 'Draft'
+            doc_status = str(doc_status)
+            
+            record = {
+                'file': full_path,
+                'title': meta.get('title', ''),
+                'type': doc_type,
+                'status': doc_status,
+                'word_count': word_count,
+                'readability': calculate_readability_score(body),
+                'completeness': completeness,
+                'yaml_complete': bool(meta.get('title') and meta.get('tags')),
+            }
+            
+            records.append(record)
+            
+        except Exception as e:
+            error_msg = f"[PARSE ERROR] {full_path}: {str(e)}"
+            errors.append(error_msg)
+            if verbose:
+                print(error_msg)
+            continue
+    
+    # Convert to DataFrame (pandas is imported here so --help and small runs start fast)
+    import pandas as pd
     if records:
         df = pd.DataFrame(records)
         # Sort by completeness score (descending)
@@ -315,6 +329,8 @@ def main():
                         help='Show all errors and processing details')
     parser.add_argument('--json', action='store_true',
                         help='Output as JSON')
+    parser.add_argument('--index', type=str, default=None,
+                        help='SQLite vault index (see vaultindex.py); refreshed, then used to pre-filter files')
     
     args = parser.parse_args()
     
@@ -323,7 +339,8 @@ def main():
         sys.exit(1)
     
     print(f"Scanning {args.directory}...")
-    df = scan_directory(args.directory, args.min_words, args.max_words, args.yaml_type, args.verbose)
+    df = scan_directory(args.directory, args.min_words, args.max_words, args.yaml_type, args.verbose,
+                        index_path=args.index)
     
     if args.json:
         print(df.to_json(orient='records', indent=2))
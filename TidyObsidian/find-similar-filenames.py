@@ -4,7 +4,7 @@
 Find similar files in a directory tree # and group them by their normalized names. 
 
 Features:
-- Recursively scans all files in the specified directory. Omit directories hidden or templates.
+- Recursively scans all files in the specified directory. Omit directories hidden or templates (shared vaultscan rules).
 - Normalizes filenames by removing numeric prefixes (except Zettelkasten keys), punctuation, and standardizing separators.
 - Groups files with similar normalized names together for easy identification.
 """
@@ -13,12 +13,10 @@ import re
 import sys
 from pathlib import Path
 from collections import defaultdict
+from vaultscan import iter_vault
 
 ZETTEL_RE = re.compile(r'^(\d{12})[\s_-]+(.+)$')
 
-def is_in_hidden_dir(path: Path) -> bool:
-    return any(part.startswith(".") for part in path.parts)
-
 def normalize(name: str) -> str:
     stem, dot, ext = name.lower().rpartition(".")
     if not dot:
@@ -45,13 +43,11 @@ def normalize(name: str) -> str:
 def main(root="."):
     groups = defaultdict(list)
 
-    for path in Path(root).rglob("*"):
-        if is_in_hidden_dir(path):
-            continue
-        if path.is_file():
-            key = normalize(path.name)
-            if key:
-                groups[key].append(path)
+    for file_path, _ in iter_vault(root, extensions=None):
+        path = Path(file_path)
+        key = normalize(path.name)
+        if key:
+            groups[key].append(path)
 
     for key, files in sorted(groups.items()):
         if len(files) > 1:
@@ -9,21 +9,14 @@ import re
 import sys
 from collections import defaultdict
 from pathlib import Path
+from vaultscan import markdown_files
 
 # Pattern: YYYYMMDD followed by 4 digits (nnnn) at start of filename
 SERIAL_PATTERN = re.compile(r'^(\d{8}\d{4})')
 
 def find_markdown_files(root_dir):
-    """Find all .md files recursively."""
-    md_files = []
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        # Skip hidden directories and .obsidian, .git, .trash
-        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in {'.obsidian', '.git', '.trash', 'node_modules'}]
-        for fname in filenames:
-            if fname.endswith('.md'):
-                full_path = os.path.join(dirpath, fname)
-                md_files.append(full_path)
-    return md_files
+    """Find all .md files recursively (hidden, Templates and node_modules pruned)."""
+    return markdown_files(root_dir, extensions=('.md',))
 
 def extract_serial(filename):
     """Extract YYYYMMDDnnnn serial from filename."""
@@ -0,0 +1,228 @@
+"""
+Frontmatter Library
+
+- One YAML front matter reader for the TidyObsidian, MarkdownTools and PodcastHelper scripts.
+- Reads a file only up to the closing `---`, never the whole note.
+- Fast path for flat `key: value` headers and `key:` followed by `- item` lists. Anything else is handed to PyYAML, using the libyaml C loader when it is available.
+- `typed=True` matches `yaml.safe_load` (dates, ints, booleans, null). `typed=False` keeps every scalar a string, like `yaml.BaseLoader`.
+- `read_frontmatter_tolerant()` falls back to the old line-based `key: value` reading when a header is not valid YAML, e.g. an unquoted `title: Episode 12: The Return`.
+
+"""
+
+import datetime
+import functools
+import re
+
+KEY_RE = re.compile(r'([A-Za-z_][\w\- ]*?)[ \t]*:(?:[ \t]+(.*?))?[ \t]*')
+ITEM_RE = re.compile(r'([ \t]*)-(?:[ \t]+(.*?))?[ \t]*')
+INT_RE = re.compile(r'[-+]?(?:0|[1-9][0-9_]*)')
+DATE_RE = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})')
+
+# Plain scalars starting with these are YAML syntax, not text.
+INDICATORS = frozenset('[]{}&*!|>%@`#,?:-"\'=<')
+NULLS = frozenset({'', '~', 'null', 'Null', 'NULL'})
+BOOLS = {
+    'yes': True, 'Yes': True, 'YES': True, 'no': False, 'No': False, 'NO': False,
+    'true': True, 'True': True, 'TRUE': True, 'false': False, 'False': False, 'FALSE': False,
+    'on': True, 'On': True, 'ON': True, 'off': False, 'Off': False, 'OFF': False,
+}
+
+# Returned by the fast path when a header needs the real YAML parser.
+_FALLBACK = object()
+
+
+class FrontmatterError(ValueError):
+    """Front matter exists but is not valid YAML."""
+
+
+@functools.lru_cache(maxsize=None)
+def yaml_loaders():
+    """(yaml, safe_loader, base_loader), or None without PyYAML. Imported on first fallback only."""
+    try:
+        import yaml
+    except ImportError:
+        return None
+    return yaml, getattr(yaml, 'CSafeLoader', yaml.SafeLoader), getattr(yaml, 'CBaseLoader', yaml.BaseLoader)
+
+
+def is_fence(line):
+    """True for a `---` delimiter line (trailing spaces and CR allowed)."""
+    return line.rstrip() == '---'
+
+
+def split_frontmatter(text):
+    """Return (header_text_or_None, body) for a whole document."""
+    first_nl = text.find('\n')
+    if first_nl == -1 or not is_fence(text[:first_nl]):
+        return None, text
+    pos = first_nl + 1
+    while True:
+        nl = text.find('\n', pos)
+        end = len(text) if nl == -1 else nl
+        if is_fence(text[pos:end]):
+            return text[first_nl + 1:pos].rstrip('\r\n'), text[end + 1:]
+        if nl == -1:
+            return None, text
+        pos = nl + 1
+
+
+def read_header(path, errors='strict'):
+    """Read only the front matter lines of a file; None if it has none."""
+    with open(path, 'r', encoding='utf-8', errors=errors) as f:
+        if not is_fence(f.readline()):
+            return None
+        lines = []
+        for line in f:
+            if is_fence(line):
+                return ''.join(lines).rstrip('\r\n')
+            lines.append(line)
+    return None
+
+
+def _scalar(raw, typed):
+    """Resolve one flat scalar the way PyYAML would, or _FALLBACK if unsure."""
+    if raw[0] in '"\'':
+        quote = raw[0]
+        inner = raw[1:-1]
+        if len(raw) >= 2 and raw[-1] == quote and quote not in inner and (quote == "'" or '\\' not in inner):
+            return inner
+        return _FALLBACK
+    if raw[0] in INDICATORS or ': ' in raw or ' #' in raw or raw.endswith(':') or '\t' in raw:
+        return _FALLBACK
+    if not typed:
+        return raw
+    if raw in NULLS:
+        return None
+    if raw in BOOLS:
+        return BOOLS[raw]
+    if INT_RE.fullmatch(raw):
+        return int(raw.replace('_', ''))
+    match = DATE_RE.fullmatch(raw)
+    if match:
+        try:
+            return datetime.date(*(int(part) for part in match.groups()))
+        except ValueError:
+            return _FALLBACK
+    if raw[0] in '0123456789+.':
+        # Floats, sexagesimal, octal, hex and timestamps: leave to YAML.
+        return _FALLBACK
+    return raw
+
+
+def _parse_flat(header, typed):
+    """Fast path for flat headers; returns a dict or _FALLBACK."""
+    meta = {}
+    list_key = None
+    list_indent = None
+    for line in header.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if line[0] in ' \t-':
+            match = ITEM_RE.fullmatch(line)
+            if list_key is None or match is None:
+                return _FALLBACK
+            indent, raw = match.groups()
+            if list_indent is None:
+                list_indent = indent
+            elif indent != list_indent:
+                return _FALLBACK
+            value = _scalar(raw, typed) if raw else (None if typed else '')
+            if value is _FALLBACK:
+                return _FALLBACK
+            if not isinstance(meta[list_key], list):
+                meta[list_key] = []
+            meta[list_key].append(value)
+            continue
+        match = KEY_RE.fullmatch(line)
+        if match is None:
+            return _FALLBACK
+        key, raw = match.groups()
+        if typed and (key in BOOLS or key in NULLS):
+            return _FALLBACK
+        if raw:
+            value = _scalar(raw, typed)
+            if value is _FALLBACK:
+                return _FALLBACK
+            list_key = None
+        else:
+            value = None if typed else ''
+            list_key = key
+            list_indent = None
+        meta[key] = value
+    return meta
+
+
+def parse_frontmatter(header, typed=True):
+    """Parse header text into a dict; raises FrontmatterError on invalid YAML."""
+    if header is None:
+        return {}
+    meta = _parse_flat(header, typed)
+    if meta is not _FALLBACK:
+        return meta
+    loaders = yaml_loaders()
+    if loaders is None:
+        raise FrontmatterError('front matter is not flat and PyYAML is not installed')
+    yaml, safe_loader, base_loader = loaders
+    try:
+        loaded = yaml.load(header, Loader=safe_loader if typed else base_loader)
+    except (yaml.YAMLError, ValueError, TypeError) as e:
+        # SafeLoader raises plain ValueError/TypeError while building values, e.g. `date: 2024-02-30`
+        raise FrontmatterError(str(e)) from e
+    return loaded if isinstance(loaded, dict) else {}
+
+
+def load_frontmatter(text, typed=True):
+    """Return (meta, body) for a whole document; raises FrontmatterError on invalid YAML."""
+    header, body = split_frontmatter(text)
+    return parse_frontmatter(header, typed), body
+
+
+def read_frontmatter(path, typed=True, errors='strict'):
+    """Return the front matter dict of a file, reading only its header lines."""
+    return parse_frontmatter(read_header(path, errors), typed)
+
+
+def parse_lines(header):
+    """Line-based reading for headers that are not valid YAML, as the scripts did before this module.
+
+    Each `key: value` line is split on its first colon and surrounding quotes are
+    stripped; `- item` lines are collected under a key with no value. Values are
+    strings or lists of strings.
+    """
+    meta = {}
+    if header is None:
+        return meta
+    list_key = None
+    for line in header.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if stripped.startswith('-') and list_key is not None:
+            item = stripped[1:].strip().strip('\'"')
+            if item:
+                if not isinstance(meta[list_key], list):
+                    meta[list_key] = []
+                meta[list_key].append(item)
+            continue
+        if ':' not in stripped:
+            continue
+        key, _, value = stripped.partition(':')
+        key = key.strip()
+        value = value.strip().strip('\'"')
+        meta[key] = value
+        list_key = None if value else key
+    return meta
+
+
+def read_frontmatter_tolerant(path, errors='strict'):
+    """Front matter of a file with string scalars, like read_frontmatter(typed=False).
+
+    A header that is not valid YAML is read with parse_lines() instead of raising,
+    so every field the old hand parsers found is still returned.
+    """
+    header = read_header(path, errors)
+    try:
+        return parse_frontmatter(header, typed=False)
+    except FrontmatterError:
+        return parse_lines(header)
@@ -0,0 +1,212 @@
+"""
+Task ID Registry Library
+
+- Persistent SQLite record of every `[id:: value]` in the vault and the note holding it, so `markdown-tasks-fixid.py` no longer re-audits the whole vault before it can hand out one ID.
+- Each note keeps its mtime, size and the number of open tasks still missing an ID. Unchanged notes with nothing missing are never read again.
+- Paths are stored absolute, so fixing one note from an editor hook and a full vault run share the same registry.
+- `IdBitmap` holds the six-hex-digit IDs as one bit each over the 24-bit space (2 MB for any vault size) and hands out the next free ID in order. No retries, no collisions.
+
+"""
+
+import os
+import re
+import sqlite3
+
+REGISTRY_VERSION = '1'
+ID_SPACE = 1 << 24  # six hex digits
+HEX_ID = re.compile(r'[0-9a-f]{6}')
+FREE_BYTE = re.compile(rb'[^\xff]')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    missing INTEGER
+);
+CREATE TABLE IF NOT EXISTS ids (
+    task_id TEXT,
+    path TEXT
+);
+CREATE INDEX IF NOT EXISTS ids_task_id ON ids(task_id);
+CREATE INDEX IF NOT EXISTS ids_path ON ids(path);
+"""
+
+
+def connect(db_path):
+    """Open the registry, creating it (or starting over after a format change)."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    if version is None or version[0] != REGISTRY_VERSION:
+        with conn:
+            conn.execute("DELETE FROM files")
+            conn.execute("DELETE FROM ids")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (REGISTRY_VERSION,))
+    return conn
+
+
+def registry_key(path):
+    return os.path.abspath(path)
+
+
+def is_empty(conn):
+    return conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+
+
+def files_to_scan(conn, stats):
+    """Indexes into stats [(path, stat_result)] of notes that must be read.
+
+    A note is read when it is new to the registry, its mtime or size changed,
+    or it still had open tasks without an ID last time.
+    """
+    known = {row[0]: row[1:] for row in conn.execute("SELECT path, mtime_ns, size, missing FROM files")}
+    stale = []
+    for index, (path, st) in enumerate(stats):
+        row = known.get(registry_key(path))
+        if row is None or row[:2] != (st.st_mtime_ns, st.st_size) or row[2]:
+            stale.append(index)
+    return stale
+
+
+def record_scan(conn, path, ids, missing, stamp):
+    """Replace a note's IDs with a fresh scan. stamp is (size, mtime_ns)."""
+    key = registry_key(path)
+    conn.execute("DELETE FROM ids WHERE path = ?", (key,))
+    conn.executemany("INSERT INTO ids (task_id, path) VALUES (?, ?)", [(task_id, key) for task_id in ids])
+    conn.execute("INSERT OR REPLACE INTO files (path, mtime_ns, size, missing) VALUES (?, ?, ?, ?)",
+                 (key, stamp[1], stamp[0], missing))
+
+
+def record_fixed(conn, path, new_ids, stamp, missing):
+    """Add the IDs written into a note and its new stamp after a rewrite."""
+    key = registry_key(path)
+    conn.executemany("INSERT INTO ids (task_id, path) VALUES (?, ?)", [(task_id, key) for task_id in new_ids])
+    conn.execute("UPDATE files SET mtime_ns = ?, size = ?, missing = ? WHERE path = ?",
+                 (stamp[1], stamp[0], missing, key))
+
+
+def forget_missing(conn, directory, seen_paths):
+    """Drop notes under directory that were not seen in this walk. Returns how many."""
+    prefix = registry_key(directory).rstrip(os.sep) + os.sep
+    seen = {registry_key(path) for path in seen_paths}
+    gone = [path for (path,) in conn.execute("SELECT path FROM files WHERE substr(path, 1, ?) = ?",
+                                             (len(prefix), prefix))
+            if path not in seen]
+    for path in gone:
+        conn.execute("DELETE FROM ids WHERE path = ?", (path,))
+        conn.execute("DELETE FROM files WHERE path = ?", (path,))
+    return len(gone)
+
+
+class RegisteredIds:
+    """Set-like view of the registered IDs for the random allocator.
+
+    Nothing is loaded up front: each candidate ID is one indexed lookup, and
+    IDs handed out in this run are kept in a small set until they are recorded.
+    """
+
+    __slots__ = ('conn', 'added')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.added = set()
+
+    def add(self, task_id):
+        self.added.add(task_id)
+
+    def registered(self, task_id):
+        return self.conn.execute("SELECT 1 FROM ids WHERE task_id = ? LIMIT 1", (task_id,)).fetchone() is not None
+
+    def __contains__(self, task_id):
+        return task_id in self.added or self.registered(task_id)
+
+    def __len__(self):
+        count = self.conn.execute("SELECT COUNT(DISTINCT task_id) FROM ids").fetchone()[0]
+        return count + sum(1 for task_id in self.added if not self.registered(task_id))
+
+
+def collisions(conn, paths):
+    """Yield (task_id, path, other_path) for IDs in paths also held by another note, once per pair."""
+    reported = set()
+    for path in paths:
+        key = registry_key(path)
+        for task_id, other in conn.execute(
+                "SELECT a.task_id, b.path FROM ids a JOIN ids b ON a.task_id = b.task_id AND a.path != b.path"
+                " WHERE a.path = ? ORDER BY a.task_id, b.path", (key,)):
+            pair = (task_id, min(key, other), max(key, other))
+            if pair not in reported:
+                reported.add(pair)
+                yield task_id, key, other
+
+
+class IdBitmap:
+    """Set of task IDs with a sequential allocator.
+
+    Six-hex-digit IDs, the only kind fixid generates, are one bit each in a
+    2 MB bytearray. Any other ID string goes in a small set, so membership
+    stays exact for every ID found in the vault.
+    """
+
+    __slots__ = ('bits', 'others', 'count', 'cursor')
+
+    def __init__(self, ids=(), cursor=0):
+        self.bits = bytearray(ID_SPACE // 8)
+        self.others = set()
+        self.count = 0
+        self.cursor = cursor % ID_SPACE
+        for task_id in ids:
+            self.add(task_id)
+
+    def add(self, task_id):
+        if HEX_ID.fullmatch(task_id):
+            number = int(task_id, 16)
+            mask = 1 << (number & 7)
+            if not self.bits[number >> 3] & mask:
+                self.bits[number >> 3] |= mask
+                self.count += 1
+        else:
+            self.others.add(task_id)
+
+    def __contains__(self, task_id):
+        if HEX_ID.fullmatch(task_id):
+            number = int(task_id, 16)
+            return bool(self.bits[number >> 3] & (1 << (number & 7)))
+        return task_id in self.others
+
+    def __len__(self):
+        return self.count + len(self.others)
+
+    def allocate(self):
+        """Mark and return the first free ID at or after the cursor, wrapping around once."""
+        if self.count >= ID_SPACE:
+            raise ValueError(f"All {ID_SPACE} six-digit task IDs are in use")
+        byte = self.cursor >> 3
+        # Bits below the cursor in its own byte count as taken until the search wraps
+        value = self.bits[byte] | ((1 << (self.cursor & 7)) - 1)
+        if value == 0xff:
+            # The regex finds the next byte with a clear bit in C, skipping full bytes
+            match = FREE_BYTE.search(self.bits, byte + 1) or FREE_BYTE.search(self.bits)
+            byte = match.start()
+            value = self.bits[byte]
+        bit = (~value & (value + 1)).bit_length() - 1  # lowest clear bit
+        self.bits[byte] |= 1 << bit
+        self.count += 1
+        number = (byte << 3) | bit
+        self.cursor = (number + 1) % ID_SPACE
+        return f"{number:06x}"
+
+
+def load_bitmap(conn):
+    """IdBitmap of every registered ID, resuming from the cursor saved by save_cursor()."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+    return IdBitmap((task_id for (task_id,) in conn.execute("SELECT task_id FROM ids")),
+                    int(row[0]) if row else 0)
+
+
+def save_cursor(conn, bitmap):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (str(bitmap.cursor),))
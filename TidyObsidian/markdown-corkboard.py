@@ -25,6 +25,8 @@ from PySide6.QtWidgets import (
     QStatusBar,
 )
 
+from frontmatter import read_frontmatter_tolerant
+
 
 class CardItem(QGraphicsRectItem):
     def __init__(self, title: str, description: str | None = None, *args, **kwargs):
@@ -62,34 +64,16 @@ class CorkboardView(QGraphicsView):
 def parse_front_matter(path: Path):
     """Return (title, description) from YAML front matter if present, else (stem, None)."""
     try:
-        text = path.read_text(encoding="utf-8")
-    except Exception:
-        return path.stem, None
-
-    lines = text.splitlines()
-    if not lines or lines[0].strip() != "---":
+        meta = read_frontmatter_tolerant(path)
+    except (OSError, UnicodeDecodeError):
         return path.stem, None
 
-    yaml_lines = []
-    i = 1
-    while i < len(lines) and lines[i].strip() != "---":
-        yaml_lines.append(lines[i])
-        i += 1
-
-    title = None
-    description = None
-
-    for line in yaml_lines:
-        stripped = line.strip()
-        if stripped.startswith("title:") and title is None:
-            title = stripped.split(":", 1)[1].strip().strip('"')
-        elif stripped.startswith("description:") and description is None:
-            description = stripped.split(":", 1)[1].strip().strip('"')
-
-    if not title:
-        title = path.stem
+    title = meta.get("title")
+    description = meta.get("description")
+    if description is not None:
+        description = str(description)
 
-    return title, description
+    return str(title) if title else path.stem, description
 
 
 class MainWindow(QMainWindow):
@@ -7,13 +7,17 @@ Markdown Tasks Extract
 
 """
 
-import os
 import re
 import argparse
-import multiprocessing
-import pandas as pd
+import csv
 import hashlib
+import sys
+from operator import itemgetter
+from markdowntasks import OPEN_TASK_MARKER, decode_lines, read_if_contains
+from vaultscan import iter_vault
+from workpool import imap_chunked, map_sized
 
+CSV_COLUMNS = ['id', 'created', 'priority', 'due', 'desc_hash', 'deps_hash']
 
 
 def get_hash(text):
@@ -35,26 +39,58 @@ def parse_task_line(line):
         "desc_hash": get_hash(description)
     }
 
-def worker(file_paths):
-    """Processes a batch of files and returns a list of task records."""
+def extract_file(path):
+    """Returns the task records of one file (pool worker)."""
     task_pattern = re.compile(r'^\s*-\s*\[ \].*')
-    batch_results = []
-    
-    for path in file_paths:
-        try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    if task_pattern.match(line):
-                        task_data = parse_task_line(line)
-                        task_data['file_source'] = path
-                        # Extract the ID into its own field for sorting logic
-                        task_data['id'] = task_data['metadata'].get('id', '')
-                        deps = task_data['metadata'].get('dependson', '')
-                        task_data['deps_hash'] = get_hash(deps) if deps else ""
-                        batch_results.append(task_data)
-        except Exception:
-            pass
-    return batch_results
+    records = []
+    try:
+        # Skip files without an open checkbox before decoding them
+        raw = read_if_contains(path, (OPEN_TASK_MARKER,))
+        if raw is None:
+            return records
+        for line in decode_lines(raw):
+            if '[ ]' in line and task_pattern.match(line):
+                task_data = parse_task_line(line)
+                task_data['file_source'] = path
+                # Extract the ID into its own field for sorting logic
+                task_data['id'] = task_data['metadata'].get('id', '')
+                deps = task_data['metadata'].get('dependson', '')
+                task_data['deps_hash'] = get_hash(deps) if deps else ""
+                records.append(task_data)
+    except Exception:
+        pass
+    return records
+
+def sort_by_id_desc(records):
+    """Sort by 'id' descending. Empty IDs sort lowest; the sort is stable, so ties keep scan order."""
+    return sorted(records, key=itemgetter('id'), reverse=True)
+
+def format_standard(task):
+    """One task rebuilt in Dataview format."""
+    meta_str = " ".join([f"[{k}:: {v}]" for k, v in task['metadata'].items()])
+    return f"- [ ] {task['description']} {meta_str}".strip()
+
+def write_csv(records, out):
+    """Stream records as CSV: id, created, priority, due and the two hashes."""
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(CSV_COLUMNS)
+    for task in records:
+        meta = task['metadata']
+        writer.writerow([task['id'], meta.get('created', ''), meta.get('priority', ''), meta.get('due', ''),
+                         task['desc_hash'], task['deps_hash']])
+
+def write_dataframe(records, path):
+    """Optional export: save the records as a pickled pandas DataFrame for notebook analysis."""
+    # Deferred: pandas costs more to import than most runs spend scanning.
+    try:
+        import pandas as pd
+    except ImportError:
+        sys.exit("--dataframe needs pandas: pip3 install pandas")
+    df = pd.DataFrame(records)
+    for key in ('created', 'priority', 'due'):
+        df[key] = [meta.get(key, '') for meta in df['metadata']]
+    df.to_pickle(path)
+    print(f"Wrote {len(df)} tasks to {path}", file=sys.stderr)
 
 def main():
     parser = argparse.ArgumentParser(description="High-speed Renegade Task Extractor")
@@ -62,60 +98,57 @@ def main():
     parser.add_argument("--standardize", action="store_true", help="Display Tasks in Dataview format (Sorted by ID Desc)")
     parser.add_argument("--csv", action="store_true", help="Output in CSV format (Sorted by ID Desc)")
     parser.add_argument("--limit", type=int, default=None, help="Stop after finding N files with tasks")
+    parser.add_argument("--dataframe", metavar="PATH", default=None,
+                        help="Save the tasks as a pickled pandas DataFrame instead of printing (needs pandas)")
+    parser.add_argument("--worker-stats", action="store_true", help="Report per-worker utilisation on stderr")
     args = parser.parse_args()
 
     # 1. Collection Phase (Ignoring hidden dirs and Templates)
     all_files = []
-    for root, dirs, files in os.walk(args.directory):
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'Templates']
-        for f in files:
-            if f.endswith('.md') and 'Template' not in f:
-                all_files.append(os.path.join(root, f))
-                if args.limit and len(all_files) >= args.limit:
-                    break
+    sizes = []
+    for path, st in iter_vault(args.directory, extensions=('.md',)):
+        all_files.append(path)
+        sizes.append(st.st_size)
         if args.limit and len(all_files) >= args.limit:
             break
 
-    # 2. Extraction Phase (Multiprocessing)
-    num_procs = multiprocessing.cpu_count()
     if not all_files:
         return
-        
-    chunk_size = max(1, len(all_files) // num_procs)
-    chunks = [all_files[i:i + chunk_size] for i in range(0, len(all_files), chunk_size)]
 
-    with multiprocessing.Pool(num_procs) as pool:
-        results = pool.map(worker, chunks)
+    # 2. Extraction Phase (Multiprocessing, results kept in scan order)
+    # Default: raw unsorted list, streamed in scan-order chunks as they finish
+    if not (args.standardize or args.csv or args.limit or args.dataframe):
+        for batch in imap_chunked(extract_file, all_files, sizes, report=args.worker_stats):
+            for task in batch:
+                print(task['raw_text'])
+        return
 
-    flattened = [item for sublist in results for item in sublist]
-    df = pd.DataFrame(flattened)
+    # 3. Everything else collects all records first, so hand out the largest files first
+    records = [task for batch in map_sized(extract_file, all_files, sizes, report=args.worker_stats) for task in batch]
 
-    if df.empty:
+    if not records:
         return
 
-    # 3. Logic: If using standardized, CSV, or limit, sort by ID descending
+    # 4. Logic: If using standardized, CSV, or limit, sort by ID descending
     # Tasks with IDs will appear at the top in descending order.
     if args.standardize or args.csv or args.limit:
-        # Sort by 'id' descending. empty strings go to bottom.
-        df = df.sort_values(by='id', ascending=False, na_position='last')
+        records = sort_by_id_desc(records)
 
-    # 4. Output Phase
+    if args.dataframe:
+        write_dataframe(records, args.dataframe)
+        return
+
+    # 5. Output Phase
     if args.csv:
-        df['created'] = df['metadata'].apply(lambda x: x.get('created', ''))
-        df['priority'] = df['metadata'].apply(lambda x: x.get('priority', ''))
-        df['due'] = df['metadata'].apply(lambda x: x.get('due', ''))
-        output_cols = ['id', 'created', 'priority', 'due', 'desc_hash', 'deps_hash']
-        print(df[output_cols].to_csv(index=False))
+        write_csv(records, sys.stdout)
 
     elif args.standardize:
-        def format_row(row):
-            meta_str = " ".join([f"[{k}:: {v}]" for k, v in row['metadata'].items()])
-            return f"- [ ] {row['description']} {meta_str}".strip()
-        print("\n".join(df.apply(format_row, axis=1).tolist()))
-        
+        for task in records:
+            print(format_standard(task))
+
     else:
-        # Default: Raw unsorted list
-        print("\n".join(df['raw_text'].tolist()))
+        for task in records:
+            print(task['raw_text'])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -10,9 +10,15 @@ A quality check for Markdown Obisidan Dataview Tasks
 import os
 import re
 import argparse
-import multiprocessing
 import uuid
 import sys
+from functools import partial
+from markdowntasks import OPEN_TASK_MARKER
+from vaultscan import scan_vault
+from vaultwrite import atomic_write, commit_batch, new_batch, stage_file
+from workpool import map_sized
+
+ID_MARKER = b'[id::'
 
 def generate_short_id(existing_ids):
     """Generates a 6-char ID that is guaranteed not to be in existing_ids."""
@@ -21,78 +27,99 @@ def generate_short_id(existing_ids):
         if new_id not in existing_ids:
             return new_id
 
-def audit_file_for_ids(file_path):
-    """Fast scan of a file to extract all existing [id:: value] strings."""
+TASK_PATTERN = re.compile(r'^(\s*-\s*\[ \]\s*)(.*)')
+META_PATTERN = re.compile(r'\[(\w+)::\s*([^\]]+)\]')
+ID_PATTERN = re.compile(r'\[id::\s*([^\]]+)\]')
+LINE_END = re.compile(rb'\r\n?|\n')
+
+def scan_file(file_path):
+    """
+    One read per file: collect its existing [id:: value] strings and the byte
+    offsets of open tasks that still need an ID.
+    Returns (ids, offsets, stamp); stamp is (size, mtime_ns) so the rewrite
+    can tell if the file changed in between.
+    """
     found_ids = set()
-    id_pattern = re.compile(r'\[id::\s*([^\]]+)\]')
+    missing = []
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                matches = id_pattern.findall(line)
-                for m in matches:
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            raw = f.read()
+        stamp = (st.st_size, st.st_mtime_ns)
+        if ID_MARKER not in raw and OPEN_TASK_MARKER not in raw:
+            return found_ids, missing, stamp
+        offset = 0
+        # bytes.splitlines() breaks on \n, \r and \r\n only, the same as text-mode reads
+        for raw_line in raw.splitlines(keepends=True):
+            if ID_MARKER in raw_line or OPEN_TASK_MARKER in raw_line:
+                line = raw_line.decode('utf-8', errors='ignore')
+                for m in ID_PATTERN.findall(line):
                     found_ids.add(m.strip())
-    except Exception:
-        pass
-    return found_ids
-
-def process_file(file_path, existing_ids, live=False, remaining_limit=None):
+                match = TASK_PATTERN.match(line) if '[ ]' in line else None
+                if match and 'id' not in {m[0] for m in META_PATTERN.findall(match.group(2))}:
+                    missing.append(offset)
+            offset += len(raw_line)
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}", file=sys.stderr)
+        return set(), [], None
+    return found_ids, missing, stamp
+
+def add_id(line, new_id):
+    """Rebuild one open task line (no line ending) with [id:: new_id] added to its metadata."""
+    indent, body = TASK_PATTERN.match(line).groups()
+    meta = {m[0]: m[1].strip() for m in META_PATTERN.findall(body)}
+    meta['id'] = new_id
+    description = META_PATTERN.sub('', body).strip()
+    meta_str = " ".join([f"[{k}:: {v}]" for k, v in meta.items()])
+    return f"{indent}{description} {meta_str}".rstrip()
+
+def rewrite_file(job, batch_dir=None):
     """
-    Standardizes tasks and adds unique IDs.
-    Stops adding IDs if remaining_limit is reached.
+    Splice the reserved IDs into a file at the offsets found by scan_file().
+    Only the task lines change; every other byte is written back untouched.
     """
-    task_pattern = re.compile(r'^(\s*-\s*\[ \]\s*)(.*)')
-    meta_pattern = re.compile(r'\[(\w+)::\s*([^\]]+)\]')
-    modified_in_file = 0
-    new_lines = []
-
+    file_path, stamp, assignments = job
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-
-        for line in lines:
-            match = task_pattern.match(line)
-            if match:
-                indent, body = match.groups()
-                meta = {m[0]: m[1].strip() for m in meta_pattern.findall(body)}
-                
-                # Check if we need an ID AND if we haven't hit our global task limit
-                if 'id' not in meta:
-                    if remaining_limit is not None and remaining_limit <= 0:
-                        # Limit reached; keep original line
-                        new_lines.append(line)
-                    else:
-                        new_id = generate_short_id(existing_ids)
-                        meta['id'] = new_id
-                        existing_ids.add(new_id) 
-                        modified_in_file += 1
-                        if remaining_limit is not None:
-                            remaining_limit -= 1
-                        
-                        description = meta_pattern.sub('', body).strip()
-                        meta_str = " ".join([f"[{k}:: {v}]" for k, v in meta.items()])
-                        new_lines.append(f"{indent}{description} {meta_str}".rstrip() + "\n")
-                else:
-                    new_lines.append(line)
-            else:
-                new_lines.append(line)
-
-        if live and modified_in_file > 0:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
-                
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            raw = f.read()
+        if (st.st_size, st.st_mtime_ns) != stamp:
+            print(f"Changed since scan, skipped: {file_path}", file=sys.stderr)
+            return 0
+        parts = []
+        position = 0
+        for offset, new_id in assignments:
+            end = LINE_END.search(raw, offset)
+            line_end = end.start() if end else len(raw)
+            ending = end.group() if end else b'\n'
+            line = raw[offset:line_end].decode('utf-8', errors='ignore')
+            parts.append(raw[position:offset])
+            parts.append(add_id(line, new_id).encode('utf-8') + ending)
+            position = end.end() if end else len(raw)
+        parts.append(raw[position:])
+        if batch_dir:
+            stage_file(batch_dir, file_path, b''.join(parts))
+        else:
+            atomic_write(file_path, b''.join(parts))
     except Exception as e:
         print(f"Error processing {file_path}: {e}", file=sys.stderr)
-        
-    return modified_in_file
+        return 0
+    return len(assignments)
 
 def main():
     parser = argparse.ArgumentParser(
         description="Renegade Task Manipulator: Unique ID Generator",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
-    parser.add_argument("dir", nargs="?", help="Vault directory")
+    parser.add_argument("dir", nargs="?", help="Vault directory, or a single note")
     parser.add_argument("--fix-id", type=str, choices=['dry', 'true'], help="Mode: dry or true")
     parser.add_argument("--limit", type=int, help="Stop after this many TASKS are modified")
+    parser.add_argument("--registry", help="SQLite task ID registry; only new or changed notes are re-audited")
+    parser.add_argument("--allocator", choices=['random', 'sequential'], default='random',
+                        help="New IDs: 'random' (uuid4 draws) or 'sequential' (next free ID from a 2 MB bitmap)")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="With --fix-id true: stage every change in DIR and commit them together at the end")
+    parser.add_argument("--worker-stats", action="store_true", help="Report per-worker utilisation on stderr")
 
     if len(sys.argv) == 1:
         parser.print_help(sys.stderr)
@@ -100,39 +127,112 @@ def main():
 
     args = parser.parse_args()
     target_dir = args.dir if args.dir else "."
-
-    # 1. THE GLOBAL AUDIT (Scan all files for ID integrity)
-    all_files = []
-    for root, dirs, fs in os.walk(target_dir):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        for f in fs:
-            if f.endswith('.md'):
-                all_files.append(os.path.join(root, f))
-    
-    print(f"--- Phase 1: Auditing {len(all_files)} files for existing IDs ---", file=sys.stderr)
-    with multiprocessing.Pool(multiprocessing.cpu_count()) as pool:
-        id_sets = pool.map(audit_file_for_ids, all_files)
-    
-    master_id_registry = set().union(*id_sets)
+    if args.batch and args.fix_id == 'true':
+        try:
+            new_batch(args.batch)
+        except FileExistsError as e:
+            parser.error(str(e))
+    else:
+        args.batch = None
+
+    # 1. ONE PASS: existing IDs and the tasks missing one, per file, in parallel
+    if os.path.isfile(target_dir):
+        stats = [(target_dir, os.stat(target_dir))]
+    else:
+        stats = scan_vault(target_dir, extensions=('.md',), restat=True)
+    all_files = [path for path, _ in stats]
+    sizes = [st.st_size for _, st in stats]
+
+    registry = None
+    to_scan = range(len(all_files))
+    if args.registry:
+        # Lazy: only registry runs need sqlite3
+        import idregistry
+        registry = idregistry.connect(args.registry)
+        if idregistry.is_empty(registry) and os.path.isfile(target_dir):
+            print("Registry is empty; run once on the vault directory so new IDs are checked vault-wide.",
+                  file=sys.stderr)
+        to_scan = idregistry.files_to_scan(registry, stats)
+
+    print(f"--- Phase 1: Scanning {len(to_scan)} of {len(all_files)} files for IDs and tasks without one ---",
+          file=sys.stderr)
+    scans = [(set(), [], None)] * len(all_files)
+    results = map_sized(scan_file, [all_files[i] for i in to_scan], [sizes[i] for i in to_scan],
+                        report=args.worker_stats)
+    for index, result in zip(to_scan, results):
+        scans[index] = result
+
+    if registry is not None:
+        with registry:
+            for index in to_scan:
+                ids, offsets, stamp = scans[index]
+                if stamp is not None:
+                    idregistry.record_scan(registry, all_files[index], ids, len(offsets), stamp)
+            if not os.path.isfile(target_dir):
+                idregistry.forget_missing(registry, target_dir, all_files)
+        for task_id, path, other in idregistry.collisions(registry, [all_files[i] for i in to_scan]):
+            print(f"Duplicate ID {task_id}: {path} and {other}", file=sys.stderr)
+        if args.allocator == 'sequential':
+            master_id_registry = idregistry.load_bitmap(registry)
+        else:
+            master_id_registry = idregistry.RegisteredIds(registry)
+    elif args.allocator == 'sequential':
+        from idregistry import IdBitmap
+        master_id_registry = IdBitmap(task_id for ids, _, _ in scans for task_id in ids)
+    else:
+        master_id_registry = set().union(*(ids for ids, _, _ in scans))
     print(f"Audit Complete. {len(master_id_registry)} IDs registered.", file=sys.stderr)
 
-    # 2. THE MODIFICATION PHASE (Serial to ensure task-level limit accuracy)
+    # 2. RESERVE IDs in file order, so --limit picks exactly the tasks a serial run would
     is_live = (args.fix_id == 'true')
-    total_modified = 0
     remaining_task_limit = args.limit
+    jobs = []
 
     print(f"--- Phase 2: Processing (Target: {'Unlimited' if args.limit is None else args.limit} tasks) ---", file=sys.stderr)
-    
-    for f in all_files:
-        # Pass the current remaining limit to the processor
-        file_mod_count = process_file(f, master_id_registry, is_live, remaining_task_limit)
-        total_modified += file_mod_count
-        
+
+    for f, size, (_, found, stamp) in zip(all_files, sizes, scans):
+        offsets = found
         if remaining_task_limit is not None:
-            remaining_task_limit -= file_mod_count
-            if remaining_task_limit <= 0:
-                print(f"Reached task limit of {args.limit}. Stopping.", file=sys.stderr)
-                break
+            offsets = offsets[:max(0, remaining_task_limit)]
+            remaining_task_limit -= len(offsets)
+        if offsets:
+            assignments = []
+            for offset in offsets:
+                if args.allocator == 'sequential':
+                    new_id = master_id_registry.allocate()
+                else:
+                    new_id = generate_short_id(master_id_registry)
+                    master_id_registry.add(new_id)
+                assignments.append((offset, new_id))
+            jobs.append(((f, stamp, assignments), size, len(found)))
+        if remaining_task_limit is not None and remaining_task_limit <= 0:
+            print(f"Reached task limit of {args.limit}. Stopping.", file=sys.stderr)
+            break
+
+    # 3. REWRITE the affected files in parallel; each already holds its own IDs
+    if is_live:
+        counts = map_sized(partial(rewrite_file, batch_dir=args.batch), [job for job, _, _ in jobs],
+                           [size for _, size, _ in jobs], report=args.worker_stats)
+        total_modified = sum(counts)
+        conflicts = []
+        if args.batch:
+            committed, conflicts = commit_batch(args.batch)
+            print(f"Batch committed: {len(committed)} files, {len(conflicts)} conflicts. "
+                  f"Undo with: vaultwrite.py rollback {args.batch}", file=sys.stderr)
+        if registry is not None:
+            with registry:
+                for ((path, _, assignments), _, found), count in zip(jobs, counts):
+                    if count and os.path.realpath(path) not in conflicts:
+                        st = os.stat(path)
+                        idregistry.record_fixed(registry, path, [new_id for _, new_id in assignments],
+                                                (st.st_size, st.st_mtime_ns), found - count)
+                if args.allocator == 'sequential':
+                    idregistry.save_cursor(registry, master_id_registry)
+    else:
+        total_modified = sum(len(job[2]) for job, _, _ in jobs)
+
+    if registry is not None:
+        registry.close()
 
     status = "MODIFIED" if is_live else "WOULD REQUIRE FIX"
     print(f"--- Summary ---\n{status}: {total_modified} tasks.", file=sys.stderr)
@@ -8,12 +8,31 @@ Extract markdown tasks, clean them up, present in proper order. Standardize on O
 """
 
 
-import os
 import re
 import argparse
-import multiprocessing
-import pandas as pd
 import sys
+from functools import partial
+from markdowntasks import OPEN_TASK_MARKER, decode_lines, read_if_contains
+from vaultscan import scan_vault
+from vaultwrite import atomic_write, commit_batch, new_batch, stage_file
+from workpool import map_sized
+
+# Only incomplete tasks are standardized; '-\t[ ]' is a known malformed form
+TASK_PATTERN = re.compile(r'^[\t ]*[-*]\s*\[ \].*')
+MALFORMED_TASK_PATTERN = re.compile(r'^([\t ]*)-\t\[ \](.*)')
+COMPLETED_TASK_PATTERN = re.compile(r'^[\t ]*[-*]\s*\[x\].*')
+
+# Leading structure (indentation + marker + checkbox); preserves the exact leading whitespace (\t or spaces)
+PREFIX_PATTERN = re.compile(r'^([\t ]*[-*]\s*\[ . \]\s*)(.*)')
+SINGLE_COLON_PATTERN = re.compile(r'\[(\w+):\s*([^\]]+)\]')
+META_PATTERN = re.compile(r'\[(\w+)::\s*([^\]]+)\]')
+
+EMOJI_MAP = {
+    '📅': 'due', '🛫': 'start', '⏳': 'scheduled',
+    '✅': 'completed', '➕': 'created',
+    '⏫': 'priority_high', '🔼': 'priority_medium', '🔽': 'priority_low'
+}
+EMOJI_VALUE_PATTERNS = {emoji: re.compile(fr'{emoji}\s*([\d\w\-\:]+)?') for emoji in EMOJI_MAP}
 
 def standardize_task_line(line):
     """
@@ -21,8 +40,7 @@ def standardize_task_line(line):
     and rebuilds it to the 'Perfect Standard'.
     """
     # 1. Isolate leading structure (indentation + marker + checkbox)
-    # This regex is surgical: it preserves the exact leading whitespace (\t or spaces)
-    match = re.match(r'^([\t ]*[-*]\s*\[ . \]\s*)(.*)', line)
+    match = PREFIX_PATTERN.match(line)
     if not match:
         return line, False
 
@@ -30,38 +48,35 @@ def standardize_task_line(line):
     
     # 2. Heuristic Repair: Fix single colon metadata [key: val] -> [key:: val]
     # We do this before extraction so the main regex picks them up
-    repaired_body = re.sub(r'\[(\w+):\s*([^\]]+)\]', r'[\1:: \2]', body)
+    # (a function replacement is cheaper than re-expanding a template string on every call)
+    repaired_body = SINGLE_COLON_PATTERN.sub(lambda m: f"[{m.group(1)}:: {m.group(2)}]", body)
 
     # 3. Extract all valid metadata [key:: value]
-    meta_pattern = re.compile(r'\[(\w+)::\s*([^\]]+)\]')
-    metadata_items = meta_pattern.findall(repaired_body)
+    metadata_items = META_PATTERN.findall(repaired_body)
     
     # 4. Extract Description (everything NOT a metadata box)
-    description_raw = meta_pattern.sub('', repaired_body)
+    description_raw = META_PATTERN.sub('', repaired_body)
     
     # 5. Emoji to Dataview Conversion
-    emoji_map = {
-        '📅': 'due', '🛫': 'start', '⏳': 'scheduled', 
-        '✅': 'completed', '➕': 'created', 
-        '⏫': 'priority_high', '🔼': 'priority_medium', '🔽': 'priority_low'
-    }
-    
     metadata = {k: v.strip() for k, v in metadata_items}
     
-    for emoji, key in emoji_map.items():
-        if emoji in description_raw:
-            emoji_regex = re.compile(fr'{emoji}\s*([\d\w\-\:]+)?')
-            val_match = emoji_regex.search(description_raw)
-            if val_match and val_match.group(1):
-                metadata[key] = val_match.group(1).strip()
-                description_raw = emoji_regex.sub('', description_raw)
-            else:
-                metadata[key] = 'true'
-                description_raw = description_raw.replace(emoji, '')
+    # Every emoji is non-ASCII, so the common all-ASCII line skips this step in O(1)
+    if not description_raw.isascii():
+        # One emoji at a time in map order: removing one can change what the next one captures
+        for emoji, key in EMOJI_MAP.items():
+            if emoji in description_raw:
+                emoji_regex = EMOJI_VALUE_PATTERNS[emoji]
+                val_match = emoji_regex.search(description_raw)
+                if val_match and val_match.group(1):
+                    metadata[key] = val_match.group(1).strip()
+                    description_raw = emoji_regex.sub('', description_raw)
+                else:
+                    metadata[key] = 'true'
+                    description_raw = description_raw.replace(emoji, '')
 
     # 6. Final Cleaning
     # Collapse multiple spaces into one, trim ends
-    clean_description = " ".join(description_raw.split()).strip()
+    clean_description = " ".join(description_raw.split())
     
     # 7. Rebuild the Task
     # Force single space between description and metadata, and between metadata boxes
@@ -69,8 +84,7 @@ def standardize_task_line(line):
     
     # Standardize the prefix to " - [ ] " (one space after the marker)
     # but KEEP the 'leading_indent' (the \t or spaces before the dash)
-    # We extract the leading indent from the original prefix
-    indent_only = re.match(r'^([\t ]*)', prefix).group(1)
+    indent_only = prefix[:len(prefix) - len(prefix.lstrip('\t '))]
     marker_char = "-" # Standardize * to -
     checkbox = "[ ] " if "[ ]" in prefix else "[x] "
     final_prefix = f"{indent_only}{marker_char} {checkbox}"
@@ -81,21 +95,19 @@ def standardize_task_line(line):
     # If the standardized version differs from the original, we have a modification
     return standardized_line, standardized_line != line
 
-def process_file(file_path, live=False):
+def process_file(file_path, live=False, batch_dir=None):
     """Line-by-line processor using the standardization logic."""
     modified_count = 0
     new_lines = []
     # Add a counter to track the number of tasks reviewed
     reviewed_count = 0
-    # Updated task pattern to only match incomplete tasks
-    task_pattern = re.compile(r'^[\t ]*[-*]\s*\[ \].*')
-
-    # Add logic to fix malformed tasks with '-\t[ ]' pattern
-    malformed_task_pattern = re.compile(r'^([\t ]*)-\t\[ \](.*)')
-
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
+        # Only open checkboxes are standardized; skip notes without one before decoding.
+        # (Completed tasks alone never cause a rewrite, so those files are skipped too.)
+        raw = read_if_contains(file_path, (OPEN_TASK_MARKER,))
+        if raw is None:
+            return modified_count
+        lines = decode_lines(raw)
 
         # We use a simple list here for line-by-line processing, 
         # but the transformation itself is "atomic" per line
@@ -103,18 +115,24 @@ def process_file(file_path, live=False):
         # Ensure 'new_line' is always defined before use
         # Skip completed tasks explicitly
         for line in lines:
-            if malformed_task_pattern.match(line):
+            if '[ ]' not in line:
+                # Cheap path: neither task pattern can match without an open checkbox
+                if '[x]' in line and COMPLETED_TASK_PATTERN.match(line):
+                    continue  # Skip completed tasks
+                new_lines.append(line)
+                continue
+            if MALFORMED_TASK_PATTERN.match(line):
                 reviewed_count += 1
-                line = malformed_task_pattern.sub(r'\1- [ ] \2', line)  # Fix the malformed task
+                line = MALFORMED_TASK_PATTERN.sub(r'\1- [ ] \2', line)  # Fix the malformed task
                 new_line, was_modified = standardize_task_line(line)
                 if not was_modified:
                     print(f"Non-standard task could not be fixed: {line}", file=sys.stderr)
-            elif task_pattern.match(line):
+            elif TASK_PATTERN.match(line):
                 reviewed_count += 1
                 new_line, was_modified = standardize_task_line(line)
                 if not was_modified:
                     print(f"Non-standard task could not be fixed: {line}", file=sys.stderr)
-            elif re.match(r'^[\t ]*[-*]\s*\[x\].*', line):
+            elif COMPLETED_TASK_PATTERN.match(line):
                 continue  # Skip completed tasks
             else:
                 new_line = line  # Default to the original line if no match
@@ -126,8 +144,11 @@ def process_file(file_path, live=False):
         print(f"Reviewed {reviewed_count} tasks in file: {file_path}", file=sys.stderr)
 
         if live and modified_count > 0:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
+            data = "".join(new_lines).encode('utf-8')
+            if batch_dir:
+                stage_file(batch_dir, file_path, data)
+            else:
+                atomic_write(file_path, data)
                 
     except Exception as e:
         # Enhanced error logging in process_file
@@ -140,23 +161,34 @@ def main():
     parser.add_argument("dir", nargs="?", default=".", help="Vault directory")
     parser.add_argument("--fixtasks", nargs="?", const="dry", choices=['dry', 'true'],
                         help="Standardize tasks: 'dry' (report only) or 'true' (modify disk)")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="With --fixtasks true: stage every change in DIR and commit them together at the end")
+    parser.add_argument("--worker-stats", action="store_true", help="Report per-worker utilisation on stderr")
 
     args = parser.parse_args()
     is_live = (args.fixtasks == 'true')
+    batch_dir = args.batch if is_live else None
+    if batch_dir:
+        try:
+            new_batch(batch_dir)
+        except FileExistsError as e:
+            parser.error(str(e))
 
     # Collect files ignoring hidden directories and Templates
-    all_files = []
-    # Adjusted file collection to include additional markdown extensions
-    for root, dirs, fs in os.walk(args.dir):
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'Templates']
-        for f in fs:
-            if f.endswith(('.md', '.markdown')) and 'Template' not in f:
-                all_files.append(os.path.join(root, f))
+    stats = scan_vault(args.dir)
+    all_files = [path for path, _ in stats]
 
     print(f"--- Quality Audit: {len(all_files)} files ---", file=sys.stderr)
     
-    with multiprocessing.Pool(multiprocessing.cpu_count()) as pool:
-        counts = pool.starmap(process_file, [(f, is_live) for f in all_files])
+    # Largest files first so one long daily log does not hold up the other workers
+    # Sizes come from the walk's own stats, so no file is stat'ed twice
+    counts = map_sized(partial(process_file, live=is_live, batch_dir=batch_dir), all_files,
+                       [st.st_size for _, st in stats], report=args.worker_stats)
+
+    if batch_dir:
+        committed, conflicts = commit_batch(batch_dir)
+        print(f"Batch committed: {len(committed)} files, {len(conflicts)} conflicts. "
+              f"Undo with: vaultwrite.py rollback {batch_dir}", file=sys.stderr)
 
     total = sum(counts)
     status = "REPAIRED/MODIFIED" if is_live else "NON-STANDARD FOUND"
@@ -7,13 +7,38 @@ Markdown Tasks - Tree
 """
 
 import argparse
+import multiprocessing
 import os
 import re
 import sys
 from collections import defaultdict
-from markdowntasks import extract_tasks_from_line, get_tasks_from_file, get_tasks_from_directory
+from markdowntasks import extract_tasks_from_line, get_tasks_from_file, iter_tasks_from_directory
+from taskexport import EXPORT_FORMATS, WRITERS, dependent_closure
+from taskfilter import FILTER_KINDS, TaskFilterIndex
+from taskgraph import TaskGraph
+from taskstream import StreamingTaskGraph
+from urgency import UrgencyRanker
 
-def build_dependency_tree(filtered_tasks, all_tasks):
+def index_tasks(tasks):
+    """Collect tasks and their reverse dependency map in one pass.
+    
+    Accepts any iterable, so a streaming directory scan is indexed while
+    files are still being parsed.
+    
+    Returns:
+        Tuple of (all_tasks list, reverse_deps: task_id -> [tasks that depend on it])
+    """
+    all_tasks = []
+    reverse_deps = defaultdict(list)
+    for task in tasks:
+        all_tasks.append(task)
+        for dep_id in task.get('dependencies', []):
+            if dep_id:
+                reverse_deps[dep_id].append(task)
+    return all_tasks, reverse_deps
+
+
+def build_dependency_tree(filtered_tasks, all_tasks, reverse_deps=None):
     """Build a hierarchical dependency tree from filtered tasks and their dependencies.
     
     Shows which tasks depend on the filtered root tasks.
@@ -21,45 +46,40 @@ def build_dependency_tree(filtered_tasks, all_tasks):
     Args:
         filtered_tasks: Tasks to use as root nodes (from filter/limit)
         all_tasks: All tasks in the corpus to find dependents from
+        reverse_deps: Reverse dependency map from index_tasks(), built here if omitted
     
     Returns:
         Tuple of (graph, task_map, root_task_ids)
     """
-    # Create a lookup map for all tasks by their ID
-    task_by_id = {}
-    all_tasks_list = []
-    for task in all_tasks:
-        task_id = task.get('id')
-        if task_id:
-            task_by_id[task_id] = task
-        all_tasks_list.append(task)
-    
-    # Build reverse dependency map: task_id -> [tasks that depend on this task]
-    reverse_deps = defaultdict(list)
-    for task in all_tasks_list:
-        for dep_id in task.get('dependencies', []):
-            if dep_id:
-                reverse_deps[dep_id].append(task)
+    if reverse_deps is None:
+        all_tasks, reverse_deps = index_tasks(all_tasks)
     
     # Graph: parent_task_id -> [child_task_ids]
     graph = defaultdict(list)
     task_map = {}
     visited = set()
     
-    def add_task_tree(task, depth=0):
-        """Recursively add task and its dependents to the graph."""
+    def add_task_tree(task):
+        """Add task and everything that depends on it, depth first, without recursion."""
         task_id = task.get('id')
-        if not task_id or task_id in visited or depth > 10:
+        if not task_id or task_id in visited:
             return
         visited.add(task_id)
         task_map[task_id] = task
-        
-        # Find tasks that depend on this task (direct dependents)
-        for dependent_task in reverse_deps.get(task_id, []):
-            dep_task_id = dependent_task.get('id')
-            if dep_task_id and dep_task_id not in visited:
-                graph[task_id].append(dep_task_id)
-                add_task_tree(dependent_task, depth + 1)
+        stack = [(task_id, iter(reverse_deps.get(task_id, ())))]
+        while stack:
+            parent_id, dependents = stack[-1]
+            # Find tasks that depend on this task (direct dependents)
+            for dependent_task in dependents:
+                dep_task_id = dependent_task.get('id')
+                if dep_task_id and dep_task_id not in visited:
+                    graph[parent_id].append(dep_task_id)
+                    visited.add(dep_task_id)
+                    task_map[dep_task_id] = dependent_task
+                    stack.append((dep_task_id, iter(reverse_deps.get(dep_task_id, ()))))
+                    break
+            else:
+                stack.pop()
     
     # Get root task IDs from filtered tasks
     root_task_ids = []
@@ -101,90 +121,172 @@ def display_tree(graph, task_map, root_tasks=None, indent=0, max_depth=5, visite
     if max_depth <= 0 or not root_tasks:
         return
     
-    for task_id in root_tasks:
-        if task_id in visited:
-            continue
-        visited.add(task_id)
-        
-        task = task_map.get(task_id)
-        if not task:
-            continue
-        
-        # Format: indent + optional box corner + task text + status
-        status_char = 'x' if task.get('status') == 'done' else ' '
-        task_text = task.get('text', 'Unknown')
-        prefix = '└── ' if show_prefix else ''
-        print(' ' * indent + prefix + f"[{status_char}] {task_text}")
-        
-        # Recursively display children
-        children = graph.get(task_id, [])
-        if children:
-            # Increment indent by 1 for each level (aligns in middle of previous └──)
-            child_indent = indent + 1
-            display_tree(graph, task_map, children, child_indent, max_depth - 1, visited, show_prefix=True)
+    # One (remaining ids, indent, depth left, prefix) frame per level instead of recursion
+    stack = [(iter(root_tasks), indent, max_depth, show_prefix)]
+    while stack:
+        task_ids, level, depth, prefixed = stack[-1]
+        for task_id in task_ids:
+            if task_id in visited:
+                continue
+            visited.add(task_id)
+            
+            task = task_map.get(task_id)
+            if not task:
+                continue
+            
+            # Format: indent + optional box corner + task text + status
+            prefix = '└── ' if prefixed else ''
+            print(' ' * level + prefix + format_task(task))
+            
+            # Descend into children (indent by 1 per level, aligning in the middle of the previous └──)
+            children = graph.get(task_id, [])
+            if children and depth > 1:
+                stack.append((iter(children), level + 1, depth - 1, True))
+                break
+        else:
+            stack.pop()
+
+
+def format_task(task):
+    """One task as '[ ] text' / '[x] text', the way the tree shows it."""
+    status_char = 'x' if task.get('status') == 'done' else ' '
+    return f"[{status_char}] {task.get('text', 'Unknown')}"
+
+
+def report_graph(graph, cycles=False, order=False, critical_path=False):
+    """Print dependency cycles, topological order and the critical path across all tasks."""
+    if cycles:
+        found = graph.cycles()
+        print(f"--- Dependency cycles ({len(found)}) ---")
+        for component in found:
+            members = [graph.tasks[node] for node in component]
+            print(" -> ".join(f"{member.get('id')}" for member in members))
+            for member in members:
+                print(f"    {format_task(member)}")
+        for node, dep_id in graph.missing:
+            print(f"Missing dependency {dep_id}: {format_task(graph.tasks[node])}", file=sys.stderr)
+    if order:
+        print(f"--- Topological order ({len(graph)} tasks, prerequisites first) ---")
+        for node in graph.topological_order():
+            print(format_task(graph.tasks[node]))
+    if critical_path:
+        length, path = graph.critical_path()
+        print(f"--- Critical path ({length} open tasks) ---")
+        for node in path:
+            print(format_task(graph.tasks[node]))
+
+
+def describe_filters(terms, match='all'):
+    """"hashtag 'Project'" or "hashtag 'a' and catalog 'b'" for the summary line."""
+    joiner = ' and ' if match == 'all' else ' or '
+    return joiner.join(f"{kind} '{value}'" for kind, value in terms)
 
 
-def filter_tasks_by_hashtag(tasks, hashtag):
-    """Filter tasks that contain the specified hashtag.
+def sort_tasks_by_urgency(tasks, ranker=None):
+    """Sort tasks by urgency: open tasks first, then by descending urgency score.
+    
+    The score (see urgency.py) adds the due date, the priority and how many tasks
+    wait on this one. Pass a ranker built over the full task list so dependents
+    outside the filtered set count too; re-sorting with it is only a key lookup.
     """
-    filtered_tasks = []
-    for task in tasks:
-        if hashtag in task.get('tags', []):
-            filtered_tasks.append(task)
-    return filtered_tasks
+    if ranker is None:
+        ranker = UrgencyRanker(tasks)
+    return ranker.rank(tasks)
 
 
-def filter_tasks_by_catalog(tasks, catalog):
-    """Filter tasks by catalog (implementation depends on catalog format).
+def display_group(tasks, terms=(), match='all', max_depth=5):
+    """Tree for one complete group of linked tasks, ranked and shown as the full tree would.
+    
+    Returns the number of root tasks shown (0 when no task matches the filters).
     """
-    filtered_tasks = []
-    for task in tasks:
-        # This is a placeholder - implementation depends on how catalogs are stored
-        if catalog in task.get('tags', []) or catalog in task.get('text', ''):
-            filtered_tasks.append(task)
-    return filtered_tasks
+    roots = TaskFilterIndex(tasks).select(terms, match) if terms else tasks
+    if not roots:
+        return 0
+    roots = sort_tasks_by_urgency(roots, UrgencyRanker(tasks))
+    graph, task_map, root_task_ids = build_dependency_tree(roots, tasks)
+    display_tree(graph, task_map, root_task_ids, max_depth=max_depth, show_prefix=False)
+    return len(roots)
 
 
-def filter_tasks_by_channel(tasks, channel):
-    """Filter tasks by channel (implementation depends on channel format).
+def export_tasks(graph, roots, body, out=sys.stdout, base=0):
+    """Write the root tasks and everything that depends on them with an export body writer.
+    
+    Returns the number of nodes written.
     """
-    filtered_tasks = []
-    for task in tasks:
-        # This is a placeholder - implementation depends on how channels are stored
-        if channel in task.get('tags', []) or channel in task.get('text', ''):
-            filtered_tasks.append(task)
-    return filtered_tasks
+    node_of = {id(task): node for node, task in enumerate(graph.tasks)}
+    nodes = dependent_closure(graph, [node_of[id(task)] for task in roots])
+    body(graph, nodes, out, base)
+    return len(nodes)
 
 
-def sort_tasks_by_urgency(tasks):
-    """Sort tasks by urgency (implementation to be defined).
+def stream_tree(tasks, terms=(), match='all', max_depth=5, settle=1000, fmt='tree', out=sys.stdout):
+    """Print each group of linked tasks as soon as it is complete, holding only open groups.
+    
+    With fmt set to an export format, each group is written as part of one graph instead of a tree.
+    Returns (tasks read, root tasks shown, trees printed, streaming graph).
     """
-    # Placeholder sorting - could be based on:
-    # - Number of dependents
-    # - Due dates
-    # - Project importance
-    # - Status (todo vs done)
-    return sorted(tasks, key=lambda x: (x.get('status', 'todo'), x.get('text', '')))
+    streaming = StreamingTaskGraph(settle=settle)
+    header, body, footer = WRITERS.get(fmt, (None, None, None))
+    shown = trees = offset = 0
+    
+    def emit(groups):
+        nonlocal shown, trees, offset
+        for group in groups:
+            if body is None:
+                roots = display_group(group, terms, match, max_depth)
+            else:
+                roots = TaskFilterIndex(group).select(terms, match) if terms else group
+                if roots:
+                    # Offset keeps the `_task<N>` keys of tasks without an ID unique across groups
+                    export_tasks(TaskGraph(group), roots, body, out, offset)
+                offset += len(group)
+                roots = len(roots)
+            if roots:
+                shown += roots
+                trees += 1
+                out.flush()
+    
+    if header:
+        header(out)
+    for task in tasks:
+        emit(streaming.add(task))
+    emit(streaming.finish())
+    if footer:
+        footer(out)
+    return streaming.count, shown, trees, streaming
+
 
+def iter_tasks_from_lines(lines, name='<stdin>'):
+    """Tasks from an iterable of lines, one at a time."""
+    for line in lines:
+        task = extract_tasks_from_line(line)
+        if task:
+            task['file'] = name
+            yield task
 
-def get_tasks_from_source(source):
+
+def get_tasks_from_source(source, index_path=None, workers=None):
     """Get tasks from various input sources: stdin (-), file, or directory.
+    
+    With index_path, a directory source is answered from the SQLite vault index.
+    Stdin and a directory scan are returned as generators that yield tasks as they are parsed.
     """
     tasks = []
     
-    if source == '-':
-        # Read from stdin
-        for line in sys.stdin:
-            task = extract_tasks_from_line(line)
-            if task:
-                task['file'] = '<stdin>'
-                tasks.append(task)
+    if index_path and os.path.isdir(source):
+        from vaultindex import open_index, load_tasks
+        conn = open_index(index_path, source)
+        tasks = load_tasks(conn, source)
+        conn.close()
+    elif source == '-':
+        # Read from stdin, one line at a time
+        tasks = iter_tasks_from_lines(sys.stdin)
     elif os.path.isfile(source):
         # Single file
         tasks = get_tasks_from_file(source)
     elif os.path.isdir(source):
-        # Directory - recurse
-        tasks = get_tasks_from_directory(source, recursive=True)
+        # Directory - recurse, streaming (parsed in a process pool when workers > 1)
+        tasks = iter_tasks_from_directory(source, recursive=True, workers=workers)
     else:
         raise ValueError(f"Source '{source}' is not a valid file or directory")
     
@@ -201,7 +303,10 @@ def main():
 Examples:
   %(prog)s --hashtag Project
   %(prog)s --catalog personal --limit 5
+  %(prog)s --hashtag project --hashtag podcast --any
   cat file.md | %(prog)s --channel work -
+  markdown-tasks-extract.py notes | %(prog)s --stream -
+  %(prog)s --format jsonl /path/to/notes > tasks.jsonl
   %(prog)s /path/to/notes
         """
     )
@@ -213,20 +318,28 @@ Examples:
         help='Input source: directory (default: current), file path, or - for stdin'
     )
     
-    # Filter options (mutually exclusive, optional)
-    filter_group = parser.add_mutually_exclusive_group(required=False)
+    # Filter options (optional, repeatable; combined with AND unless --any)
+    filter_group = parser.add_argument_group('filters')
     filter_group.add_argument(
         '--hashtag',
+        action='append',
         help='Filter tasks by hashtag'
     )
     filter_group.add_argument(
         '--catalog',
+        action='append',
         help='Filter tasks by catalog'
     )
     filter_group.add_argument(
         '--channel',
+        action='append',
         help='Filter tasks by channel'
     )
+    filter_group.add_argument(
+        '--any',
+        action='store_true',
+        help='Match tasks meeting any filter instead of all of them'
+    )
     
     # Options
     parser.add_argument(
@@ -235,6 +348,17 @@ Examples:
         default=None,
         help='Limit to top N tasks'
     )
+    parser.add_argument(
+        '--index',
+        default=None,
+        help='SQLite vault index (see vaultindex.py) to read tasks from instead of rescanning'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help='Processes used to parse a directory (default: CPU count, 1 = serial)'
+    )
     parser.add_argument(
         '--max-depth',
         type=int,
@@ -242,56 +366,118 @@ Examples:
         help='Maximum depth to display in the tree (default: 5)'
     )
     
+    parser.add_argument(
+        '--cycles',
+        action='store_true',
+        help='After the tree, list dependency cycles across all tasks'
+    )
+    parser.add_argument(
+        '--order',
+        action='store_true',
+        help='After the tree, list all tasks in dependency order (prerequisites first)'
+    )
+    parser.add_argument(
+        '--critical-path',
+        action='store_true',
+        help='After the tree, show the longest chain of open tasks'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Print each tree as soon as its linked tasks are complete instead of ranking all tasks first'
+    )
+    parser.add_argument(
+        '--settle',
+        type=int,
+        default=1000,
+        help='With --stream, tasks to read without touching a tree before it counts as complete (default: 1000)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=('tree',) + EXPORT_FORMATS,
+        default='tree',
+        help='Output the indented tree (default), or the dependency graph as DOT, GraphML or JSON lines'
+    )
+    
     args = parser.parse_args()
+    if args.stream and (args.limit or args.cycles or args.order or args.critical_path):
+        parser.error('--stream prints trees as they complete; --limit, --cycles, --order and --critical-path need every task first')
+    if args.format != 'tree' and (args.cycles or args.order or args.critical_path):
+        parser.error('--cycles, --order and --critical-path print text reports; use them with --format tree')
+    # Summary lines go to stderr when stdout carries an export
+    report = sys.stdout if args.format == 'tree' else sys.stderr
+    
+    terms = [(kind, value) for kind in FILTER_KINDS for value in getattr(args, kind) or () if value]
+    match = 'any' if args.any else 'all'
+    filter_description = describe_filters(terms, match)
+    
+    if args.stream:
+        try:
+            tasks = get_tasks_from_source(args.source, index_path=args.index, workers=args.workers)
+            count, shown, trees, streaming = stream_tree(tasks, terms, match, args.max_depth, args.settle, args.format)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        summary = f"Showed {shown} of {count} tasks"
+        if filter_description:
+            summary += f" with {filter_description}"
+        print(f"{summary} in {trees} trees", file=report)
+        unresolved = streaming.unresolved()
+        if unresolved:
+            print(f"{len(unresolved)} dependsOn IDs never appeared in the input", file=sys.stderr)
+        if streaming.duplicates:
+            print(f"{streaming.duplicates} tasks repeated an ID already read and were skipped (the first copy is shown)",
+                  file=sys.stderr)
+        if streaming.late_links:
+            print(f"{streaming.late_links} dependsOn links named a task already printed and are missing from the output; "
+                  f"raise --settle to keep them", file=sys.stderr)
+        return 0
     
     # Get all tasks from source (stdin, file, or directory)
     try:
-        tasks = get_tasks_from_source(args.source)
+        tasks, reverse_deps = index_tasks(get_tasks_from_source(args.source, index_path=args.index, workers=args.workers))
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
     
-    # Filter tasks based on the specified filter (optional)
-    if args.hashtag:
-        filtered_tasks = filter_tasks_by_hashtag(tasks, args.hashtag)
-        filter_type = "hashtag"
-        filter_value = args.hashtag
-    elif args.catalog:
-        filtered_tasks = filter_tasks_by_catalog(tasks, args.catalog)
-        filter_type = "catalog"
-        filter_value = args.catalog
-    elif args.channel:
-        filtered_tasks = filter_tasks_by_channel(tasks, args.channel)
-        filter_type = "channel"
-        filter_value = args.channel
-    else:
-        # No filter applied, show all tasks
-        filtered_tasks = tasks
-        filter_type = None
-        filter_value = None
+    # Filter tasks based on the specified filters (optional), through indexes built once
+    filtered_tasks = TaskFilterIndex(tasks).select(terms, match) if terms else tasks
     
-    # Sort tasks by urgency
-    filtered_tasks = sort_tasks_by_urgency(filtered_tasks)
+    # Sort tasks by urgency, scored against the whole task graph
+    task_graph = TaskGraph(tasks)
+    filtered_tasks = sort_tasks_by_urgency(filtered_tasks, UrgencyRanker(tasks, graph=task_graph))
     
     # Apply limit if specified
     if args.limit and len(filtered_tasks) > args.limit:
-        if filter_type:
-            print(f"Showing top {args.limit} of {len(filtered_tasks)} tasks with {filter_type} '{filter_value}'")
+        if filter_description:
+            print(f"Showing top {args.limit} of {len(filtered_tasks)} tasks with {filter_description}", file=report)
         else:
-            print(f"Showing top {args.limit} of {len(filtered_tasks)} tasks")
+            print(f"Showing top {args.limit} of {len(filtered_tasks)} tasks", file=report)
         filtered_tasks = filtered_tasks[:args.limit]
     else:
-        if filter_type:
-            print(f"Showing {len(filtered_tasks)} tasks with {filter_type} '{filter_value}'")
+        if filter_description:
+            print(f"Showing {len(filtered_tasks)} tasks with {filter_description}", file=report)
         else:
-            print(f"Showing {len(filtered_tasks)} tasks")
+            print(f"Showing {len(filtered_tasks)} tasks", file=report)
+    
+    if args.format != 'tree':
+        # Export the selected tasks and everything that depends on them, written as it is formatted
+        header, body, footer = WRITERS[args.format]
+        header(sys.stdout)
+        export_tasks(task_graph, filtered_tasks, body)
+        footer(sys.stdout)
+        return 0
     
     # Build and display dependency tree
     # Include all dependencies of the filtered tasks
-    graph, task_map, root_task_ids = build_dependency_tree(filtered_tasks, tasks)
+    graph, task_map, root_task_ids = build_dependency_tree(filtered_tasks, tasks, reverse_deps)
     
     display_tree(graph, task_map, root_task_ids, max_depth=args.max_depth, show_prefix=False)
     
+    if args.cycles or args.order or args.critical_path:
+        report_graph(task_graph, args.cycles, args.order, args.critical_path)
+    
     return 0
 
 
@@ -9,56 +9,136 @@ Markdown Tasks Library
 
 
 
+import io
 import os
 import re
+import sys
 from collections import defaultdict
 
+from vaultscan import MARKDOWN_EXTENSIONS, is_wanted_file, iter_vault
+from workpool import imap_chunked
+
+OPEN_TASK_MARKER = b'[ ]'
+DONE_TASK_MARKER = b'[x]'
+
+TEXT_PATTERN = re.compile(r'\] (.*)')
+METADATA_PATTERN = re.compile(r'\[(\w+)::\s*([^\]]+)\]')
+TAGS_PATTERN = re.compile(r'#(\w+)')
+
+
+class Task:
+    """One parsed task line.
+
+    Slotted to keep large vaults small, but readable like the dict it replaced:
+    task['text'], task.get('id'), 'file' in task and task['_id'] = ... all work.
+    `tags` and `dependencies` are tuples, so the empty case is shared.
+    """
+
+    __slots__ = ('status', 'text', 'id', 'priority', 'due', 'created', 'dependson',
+                 'tags', 'dependencies', 'file', '_id')
+
+    def __init__(self, status, text, id=None, priority=None, due=None, created=None,
+                 dependson=None, tags=(), dependencies=()):
+        self.status = status
+        self.text = text
+        self.id = id
+        self.priority = priority
+        self.due = due
+        self.created = created
+        self.dependson = dependson
+        self.tags = tags
+        self.dependencies = dependencies
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (Task, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+
 def extract_tasks_from_line(line):
-    """Parse a single markdown task line into task data.
+    """Parse a single markdown task line into a Task.
     Example: '- [ ] #Project, Title of Project. [id:: A1B2C3] [dependsOn:: X9Y8Z7]'
     """
-    task = {}
     # Extract task status
     if line.startswith('- [ ]'):
-        task['status'] = 'todo'
+        status = 'todo'
     elif line.startswith('- [x]'):
-        task['status'] = 'done'
+        status = 'done'
     else:
         return None
 
     # Extract task text
-    text_match = re.search(r'\] (.*)', line)
+    text_match = TEXT_PATTERN.search(line)
     if not text_match:
         return None
     full_text = text_match.group(1).strip()
-    task['text'] = full_text
 
     # Extract Obsidian Dataview metadata [key:: value]
-    metadata_pattern = re.compile(r'\[(\w+)::\s*([^\]]+)\]')
     metadata = {}
-    for match in metadata_pattern.finditer(full_text):
-        key = match.group(1).lower()
-        value = match.group(2).strip()
-        metadata[key] = value
-    
-    task['id'] = metadata.get('id')
-    task['priority'] = metadata.get('priority')
-    task['due'] = metadata.get('due')
-    task['created'] = metadata.get('created')
-    task['dependson'] = metadata.get('dependson')
-    
+    if '::' in full_text:
+        for key, value in METADATA_PATTERN.findall(full_text):
+            metadata[key.lower()] = value.strip()
+
     # Extract hashtags (#Project)
-    tags_pattern = re.compile(r'#(\w+)')
-    tags = [tag.lower() for tag in tags_pattern.findall(full_text)]
-    task['tags'] = tags if tags else []
+    tags = tuple(sys.intern(tag.lower()) for tag in TAGS_PATTERN.findall(full_text)) if '#' in full_text else ()
 
     # Extract dependencies (dependsOn field)
-    dependencies = []
-    if task.get('dependson'):
-        dependencies = [dep.strip() for dep in task['dependson'].split(',')]
-    task['dependencies'] = dependencies
+    dependson = metadata.get('dependson')
+    dependencies = tuple(dep.strip() for dep in dependson.split(',')) if dependson else ()
+
+    return Task(status, full_text, metadata.get('id'), metadata.get('priority'), metadata.get('due'),
+                metadata.get('created'), dependson, tags, dependencies)
+
+
+def read_if_contains(file_path, markers):
+    """Return the raw bytes of a file if any marker occurs in it, else None.
+
+    A cheap prefilter: most notes have no tasks, and a bytes search skips
+    them without decoding or running a regex on every line.
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    return raw if any(marker in raw for marker in markers) else None
 
-    return task
+
+def decode_lines(raw, errors='ignore'):
+    """Lines of raw exactly as open(path, encoding='utf-8', errors=errors).readlines() gives them."""
+    return io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8', errors=errors).readlines()
 
 
 def get_tasks_from_file(file_path):
@@ -66,35 +146,56 @@ def get_tasks_from_file(file_path):
     """
     tasks = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                task = extract_tasks_from_line(line)
-                if task:
-                    task['file'] = file_path
-                    tasks.append(task)
+        raw = read_if_contains(file_path, (OPEN_TASK_MARKER, DONE_TASK_MARKER))
+        if raw is None:
+            return tasks
+        for line in decode_lines(raw, errors='strict'):
+            line = line.strip()
+            task = extract_tasks_from_line(line)
+            if task:
+                task['file'] = file_path
+                tasks.append(task)
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
     return tasks
 
 
-def get_tasks_from_directory(directory, recursive=True):
+def iter_markdown_paths(directory, recursive=True):
+    """Yield markdown file paths in walk order.
+
+    Uses the vaultscan walk and skip rules, so a direct scan reads the same
+    files as the vault index.
+    """
+    if recursive:
+        for path, _ in iter_vault(directory, extensions=MARKDOWN_EXTENSIONS):
+            yield path
+        return
+    with os.scandir(directory) as it:
+        for entry in it:
+            if is_wanted_file(entry.name) and entry.is_file():
+                yield os.path.join(directory, entry.name)
+
+
+def iter_tasks_from_directory(directory, recursive=True, workers=None):
+    """Yield tasks as files are parsed, in the same order as a serial walk.
+
+    With workers > 1, files are parsed by a process pool in contiguous chunks
+    cut while the walk is still running (see workpool.py); each chunk's tasks
+    are yielded once every earlier chunk is done.
+    """
+    if not workers or workers <= 1:
+        for path in iter_markdown_paths(directory, recursive):
+            yield from get_tasks_from_file(path)
+        return
+
+    for tasks in imap_chunked(get_tasks_from_file, iter_markdown_paths(directory, recursive), workers=workers):
+        yield from tasks
+
+
+def get_tasks_from_directory(directory, recursive=True, workers=None):
     """Extract tasks from all markdown files in a directory.
     """
-    tasks = []
-    md_extensions = ('.md', '.markdown')
-    
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith(md_extensions):
-                file_path = os.path.join(root, file)
-                file_tasks = get_tasks_from_file(file_path)
-                tasks.extend(file_tasks)
-        
-        if not recursive:
-            break
-    
-    return tasks
+    return list(iter_tasks_from_directory(directory, recursive, workers))
 
 
 def add_task_ids(tasks):
@@ -0,0 +1,139 @@
+"""
+Task Export Library
+
+- Writes the dependency graph (see `taskgraph.py`) as DOT, GraphML or JSON lines, one node or edge per line, straight to the output file. The rendered graph is never held in memory.
+- Edges run from a prerequisite to each task whose `[dependsOn:: ...]` names it, the same direction as the tree.
+- A task is keyed by its `[id:: ...]`. A task without an ID, or a later copy of a repeated ID, gets a `_task<N>` key so every node stays distinct.
+
+"""
+
+import json
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+EXPORT_FORMATS = ('dot', 'graphml', 'jsonl')
+EXPORT_FIELDS = ('id', 'status', 'text', 'priority', 'due', 'created', 'dependson', 'file')
+XML_INVALID = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')  # control characters XML 1.0 cannot hold
+
+
+def node_keys(graph, base=0):
+    """Export key per node: the task ID for the first task with it, else `_task<base + node>`."""
+    keys = [f'_task{base + node}' for node in range(len(graph))]
+    for task_id, node in graph.index.items():
+        keys[node] = task_id
+    return keys
+
+
+def dependent_closure(graph, roots):
+    """Nodes reachable from the root nodes through dependents, in graph order."""
+    selected = set(roots)
+    stack = list(selected)
+    while stack:
+        for dependent in graph.dependents[stack.pop()]:
+            if dependent not in selected:
+                selected.add(dependent)
+                stack.append(dependent)
+    return sorted(selected)
+
+
+def task_fields(task):
+    """Export fields that are set on a task, as strings."""
+    fields = {}
+    for field in EXPORT_FIELDS:
+        value = task.get(field)
+        if value is not None and value != '':
+            fields[field] = str(value)
+    return fields
+
+
+def iter_edges(graph, nodes):
+    """(prerequisite, dependent) pairs with both ends in nodes."""
+    selected = set(nodes)
+    for node in nodes:
+        for dependent in graph.dependents[node]:
+            if dependent in selected:
+                yield node, dependent
+
+
+def dot_quote(value):
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+
+def write_dot_header(out):
+    out.write('digraph tasks {\n')
+    out.write('  node [shape=box];\n')
+
+
+def write_dot(graph, nodes, out, base=0):
+    keys = node_keys(graph, base)
+    for node in nodes:
+        task = graph.tasks[node]
+        fields = task_fields(task)
+        status_char = 'x' if task.get('status') == 'done' else ' '
+        attributes = [f'label={dot_quote(f"[{status_char}] " + fields.get("text", ""))}']
+        attributes.extend(f'{field}={dot_quote(value)}' for field, value in fields.items() if field != 'text')
+        out.write(f'  {dot_quote(keys[node])} [{", ".join(attributes)}];\n')
+    for prerequisite, dependent in iter_edges(graph, nodes):
+        out.write(f'  {dot_quote(keys[prerequisite])} -> {dot_quote(keys[dependent])};\n')
+
+
+def write_dot_footer(out):
+    out.write('}\n')
+
+
+def xml_text(value):
+    return escape(XML_INVALID.sub('', value))
+
+
+def write_graphml_header(out):
+    out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+    for field in EXPORT_FIELDS:
+        out.write(f'  <key id="{field}" for="node" attr.name="{field}" attr.type="string"/>\n')
+    out.write('  <graph id="tasks" edgedefault="directed">\n')
+
+
+def write_graphml(graph, nodes, out, base=0):
+    keys = node_keys(graph, base)
+    for node in nodes:
+        data = ''.join(f'<data key="{field}">{xml_text(value)}</data>'
+                       for field, value in task_fields(graph.tasks[node]).items())
+        out.write(f'    <node id={quoteattr(keys[node])}>{data}</node>\n')
+    for prerequisite, dependent in iter_edges(graph, nodes):
+        out.write(f'    <edge source={quoteattr(keys[prerequisite])} target={quoteattr(keys[dependent])}/>\n')
+
+
+def write_graphml_footer(out):
+    out.write('  </graph>\n')
+    out.write('</graphml>\n')
+
+
+def write_jsonl(graph, nodes, out, base=0):
+    keys = node_keys(graph, base)
+    for node in nodes:
+        record = {'type': 'node', 'key': keys[node]}
+        record.update(task_fields(graph.tasks[node]))
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    for prerequisite, dependent in iter_edges(graph, nodes):
+        out.write(json.dumps({'type': 'edge', 'source': keys[prerequisite], 'target': keys[dependent]},
+                             ensure_ascii=False) + '\n')
+
+
+def write_nothing(out):
+    pass
+
+
+# format -> (header, body, footer); the body can be called once per graph between them
+WRITERS = {
+    'dot': (write_dot_header, write_dot, write_dot_footer),
+    'graphml': (write_graphml_header, write_graphml, write_graphml_footer),
+    'jsonl': (write_nothing, write_jsonl, write_nothing),
+}
+
+
+def export_graph(graph, fmt, out, nodes=None):
+    """Write one whole graph, or only the given nodes and the edges between them."""
+    header, body, footer = WRITERS[fmt]
+    header(out)
+    body(graph, range(len(graph)) if nodes is None else nodes, out)
+    footer(out)
@@ -0,0 +1,85 @@
+"""
+Task Filter Library
+
+- Inverted indexes over a loaded task list, built once: tag -> task positions, and all task text joined into one string for substring lookups.
+- `--hashtag` matches a tag exactly. `--catalog` and `--channel` match a tag or any text on the task line, like the scans they replace.
+- Terms combine with AND or OR. Results keep the original task order and are cached per term, so re-running a filter interactively costs a dictionary lookup.
+
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+
+FILTER_KINDS = ('hashtag', 'catalog', 'channel')
+TEXT_SEPARATOR = '\n'  # never inside a task line, so a match cannot span two tasks
+
+
+class TaskFilterIndex:
+    """Filter indexes over a task list.
+
+    select() returns tasks from that list. Positions are indexes into `tasks`.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = list(tasks)
+        self.tags = defaultdict(list)
+        texts = []
+        self.starts = []
+        offset = 0
+        for position, task in enumerate(self.tasks):
+            for tag in set(task.get('tags', ())):
+                self.tags[tag].append(position)
+            text = task.get('text', '')
+            self.starts.append(offset)
+            texts.append(text)
+            offset += len(text) + len(TEXT_SEPARATOR)
+        self.text = TEXT_SEPARATOR.join(texts)
+        self.cache = {}
+
+    def text_positions(self, value):
+        """Positions of tasks whose text contains value, found with str.find over the joined text."""
+        found = []
+        if not value or TEXT_SEPARATOR in value:
+            return [position for position, task in enumerate(self.tasks) if value in task.get('text', '')]
+        start = self.text.find(value)
+        while start != -1:
+            position = bisect_right(self.starts, start) - 1
+            next_start = self.starts[position + 1] if position + 1 < len(self.starts) else len(self.text) + 1
+            if start + len(value) < next_start:
+                found.append(position)
+                # Skip the rest of this task; one hit is enough
+                start = self.text.find(value, next_start)
+            else:
+                # Ran into the next task (text with a separator in it); keep looking
+                start = self.text.find(value, start + 1)
+        return found
+
+    def positions(self, kind, value):
+        """Frozen set of positions matching one filter term."""
+        key = (kind, value)
+        if key not in self.cache:
+            if kind == 'hashtag':
+                matched = frozenset(self.tags.get(value, ()))
+            elif kind in ('catalog', 'channel'):
+                # Implementation depends on how catalogs and channels are stored; for now a tag or text on the line
+                matched = frozenset(self.tags.get(value, ())).union(self.text_positions(value))
+            else:
+                raise ValueError(f"Unknown filter '{kind}', expected one of {', '.join(FILTER_KINDS)}")
+            self.cache[key] = matched
+        return self.cache[key]
+
+    def select(self, terms, match='all'):
+        """Tasks matching every term (match='all') or any term (match='any'), in load order.
+
+        terms is a list of (kind, value) pairs; with no terms every task matches.
+        """
+        if not terms:
+            return list(self.tasks)
+        sets = sorted((self.positions(kind, value) for kind, value in terms), key=len)
+        if match == 'all':
+            selected = sets[0].intersection(*sets[1:])
+        elif match == 'any':
+            selected = frozenset().union(*sets)
+        else:
+            raise ValueError(f"match must be 'all' or 'any', not '{match}'")
+        return [self.tasks[position] for position in sorted(selected)]
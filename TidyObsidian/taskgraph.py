@@ -0,0 +1,163 @@
+"""
+Task Graph Library
+
+- Dependency graph over parsed markdown tasks, built once as integer adjacency lists: an edge runs from a task to each task whose `[dependsOn:: ...]` names it.
+- Everything is iterative, so a dependency chain of any length is handled without hitting Python's recursion limit.
+- Cycles with Tarjan's strongly connected components, topological order (prerequisites first), and the critical path: the longest chain of open tasks.
+
+"""
+
+from collections import defaultdict
+
+
+class TaskGraph:
+    """Dependency graph of a task list.
+
+    Nodes are positions in `tasks`. A task without an ID is still a node (it can
+    depend on others) but nothing can depend on it. When an ID appears on more
+    than one task, the first one is the node dependents attach to.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = list(tasks)
+        self.index = index = {}
+        self.duplicates = defaultdict(list)
+        task_ids = [task.get('id') for task in self.tasks]
+        for node, task_id in enumerate(task_ids):
+            if not task_id:
+                continue
+            if task_id in index:
+                self.duplicates[task_id].append(node)
+            else:
+                index[task_id] = node
+
+        self.prerequisites = prerequisites = [[] for _ in self.tasks]
+        self.dependents = dependents = [[] for _ in self.tasks]
+        self.missing = []  # (node, dependsOn ID that no task has)
+        for node, task in enumerate(self.tasks):
+            for dep_id in task.get('dependencies', ()):
+                if not dep_id:
+                    continue
+                prerequisite = index.get(dep_id)
+                if prerequisite is None:
+                    self.missing.append((node, dep_id))
+                else:
+                    prerequisites[node].append(prerequisite)
+                    dependents[prerequisite].append(node)
+        self._components = None
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def strongly_connected_components(self):
+        """Tarjan's algorithm, iteratively. Components come out dependents first.
+
+        That is reverse topological order: every component is listed before
+        any component it depends on.
+        """
+        if self._components is not None:
+            return self._components
+        edges = self.dependents
+        count = len(edges)
+        order = [-1] * count
+        low = [0] * count
+        on_stack = [False] * count
+        stack = []
+        components = []
+        counter = 0
+        for root in range(count):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            # Explicit DFS: the node path and, per node, the next child to look at
+            path = [root]
+            positions = [0]
+            while path:
+                node = path[-1]
+                children = edges[node]
+                position = positions[-1]
+                if position < len(children):
+                    positions[-1] = position + 1
+                    child = children[position]
+                    if order[child] == -1:
+                        order[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = True
+                        path.append(child)
+                        positions.append(0)
+                    elif on_stack[child] and order[child] < low[node]:
+                        low[node] = order[child]
+                    continue
+                path.pop()
+                positions.pop()
+                if path and low[node] < low[path[-1]]:
+                    low[path[-1]] = low[node]
+                if low[node] == order[node]:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component = [member]
+                    while member != node:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                    components.append(component)
+        self._components = components
+        return components
+
+    def cycles(self):
+        """Components that form a dependency cycle (more than one task, or a task depending on itself)."""
+        return [component for component in self.strongly_connected_components()
+                if len(component) > 1 or component[0] in self.dependents[component[0]]]
+
+    def topological_order(self):
+        """Every node, prerequisites before the tasks that depend on them.
+
+        Tasks in the same cycle have no valid order among themselves and come
+        out together.
+        """
+        return [node for component in reversed(self.strongly_connected_components()) for node in component]
+
+    def critical_path(self, weight=None):
+        """Longest chain of dependencies, by default counting open tasks only.
+
+        Cycles are collapsed into one step that weighs the sum of its tasks.
+        Returns (total weight, [node, ...]) from the first prerequisite to the last dependent.
+        """
+        if weight is None:
+            weights = [0 if task.get('status') == 'done' else 1 for task in self.tasks]
+        else:
+            weights = [weight(task) for task in self.tasks]
+        components = self.strongly_connected_components()
+        if not components:
+            return 0, []
+        component_of = [0] * len(self.tasks)
+        for number, component in enumerate(components):
+            for node in component:
+                component_of[node] = number
+        prerequisites = self.prerequisites
+        best = [0] * len(components)
+        previous = [-1] * len(components)
+        # Reversed Tarjan order visits every prerequisite component first
+        for number in range(len(components) - 1, -1, -1):
+            longest = 0
+            total = 0
+            for node in components[number]:
+                total += weights[node]
+                for prerequisite in prerequisites[node]:
+                    source = component_of[prerequisite]
+                    if best[source] > longest and source != number:
+                        longest = best[source]
+                        previous[number] = source
+            best[number] = longest + total
+        end = max(range(len(components)), key=best.__getitem__)
+        chain = []
+        number = end
+        while number != -1:
+            chain.append(number)
+            number = previous[number]
+        path = [node for number in reversed(chain) for node in components[number]]
+        return best[end], path
@@ -0,0 +1,139 @@
+"""
+Task Stream Library
+
+- Builds the dependency graph incrementally, one task at a time, for input too large to hold (e.g. `markdown-tasks-extract.py` output from a git history replay piped into `markdown-tasks-tree.py -`).
+- Tasks joined by `[dependsOn:: ...]` links form a group. A forward reference waits until a task with that ID arrives, then the two groups merge (union-find, smaller into larger).
+- A group is complete once nothing it depends on is still missing and no new task has touched it for `settle` tasks. Complete groups are handed back to the caller and dropped; only their IDs are kept, so late references to them do not wait forever.
+
+"""
+
+from collections import defaultdict, deque
+
+
+class TaskGroup:
+    """Tasks connected by dependsOn links, plus the IDs they still wait for."""
+
+    __slots__ = ('tasks', 'ids', 'pending', 'touched', 'merged')
+
+    def __init__(self, seq, task):
+        self.tasks = [(seq, task)]
+        self.ids = []
+        self.pending = set()
+        self.touched = seq
+        self.merged = None
+
+    def sorted_tasks(self):
+        """Tasks in arrival order."""
+        return [task for _, task in sorted(self.tasks, key=lambda pair: pair[0])]
+
+
+class StreamingTaskGraph:
+    """Incremental dependency grouping over a stream of tasks.
+
+    add() returns the groups completed by that task, finish() returns the rest at
+    end of input. A repeated ID keeps the first task, as in TaskGraph; later copies
+    are counted in `duplicates` and dropped. A dependsOn link to a task that was
+    already handed back cannot join its group; it is counted in `late_links`.
+    """
+
+    def __init__(self, settle=1000):
+        self.settle = settle
+        self.count = 0  # tasks read, duplicates included; the clock for `settle`
+        self.duplicates = 0
+        self.late_links = 0  # dependsOn links to tasks already handed back
+        self.owner = {}  # task ID -> group holding it (follow .merged)
+        self.waiting = defaultdict(list)  # missing ID -> groups waiting on it
+        self.emitted = set()  # IDs of tasks already handed back
+        self.queue = deque()  # (touched, group) in touch order; stale entries are skipped
+        self.held = {}  # id(group) -> group still waiting on a missing ID
+
+    @staticmethod
+    def find(group):
+        root = group
+        while root.merged is not None:
+            root = root.merged
+        while group.merged is not None and group.merged is not root:
+            group.merged, group = root, group.merged
+        return root
+
+    def merge(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first is second:
+            return first
+        if len(first.tasks) < len(second.tasks):
+            first, second = second, first
+        first.tasks.extend(second.tasks)
+        first.ids.extend(second.ids)
+        first.pending |= second.pending
+        second.tasks = second.ids = second.pending = None
+        second.merged = first
+        self.held.pop(id(second), None)
+        return first
+
+    def add(self, task):
+        """Add one task and return the groups that are complete as a result."""
+        self.count += 1
+        task_id = task.get('id')
+        if task_id and (task_id in self.owner or task_id in self.emitted):
+            self.duplicates += 1
+            return self.ready()
+        group = TaskGroup(self.count, task)
+        for dep_id in task.get('dependencies', ()):
+            if not dep_id or dep_id == task_id:
+                continue
+            if dep_id in self.owner:
+                group = self.merge(group, self.owner[dep_id])
+            elif dep_id in self.emitted:
+                self.late_links += 1
+            else:
+                group.pending.add(dep_id)
+                self.waiting[dep_id].append(group)
+        if task_id:
+            group.ids.append(task_id)
+            self.owner[task_id] = group
+            # Resolve forward references that were waiting for this ID
+            for waiter in self.waiting.pop(task_id, ()):
+                waiter = self.find(waiter)
+                waiter.pending.discard(task_id)
+                group = self.merge(group, waiter)
+        group = self.find(group)
+        group.touched = self.count
+        if not group.ids and not group.pending:
+            # Nothing can ever depend on a group without IDs
+            return [self.release(group)] + self.ready()
+        self.queue.append((self.count, group))
+        return self.ready()
+
+    def ready(self):
+        """Groups untouched for `settle` tasks and not waiting on a missing ID."""
+        done = []
+        while self.queue and self.queue[0][0] <= self.count - self.settle:
+            touched, group = self.queue.popleft()
+            if group.merged is not None or group.touched != touched:
+                continue
+            if group.pending:
+                self.held[id(group)] = group
+            else:
+                done.append(self.release(group))
+        return done
+
+    def release(self, group):
+        for task_id in group.ids:
+            del self.owner[task_id]
+            self.emitted.add(task_id)
+        self.held.pop(id(group), None)
+        return group.sorted_tasks()
+
+    def finish(self):
+        """Every group still open at end of input, oldest first."""
+        groups = {}
+        for touched, group in self.queue:
+            if group.merged is None and group.touched == touched:
+                groups[id(group)] = group
+        groups.update(self.held)
+        self.queue.clear()
+        return [self.release(group) for group in sorted(groups.values(), key=lambda group: min(seq for seq, _ in group.tasks))]
+
+    def unresolved(self):
+        """dependsOn IDs that no task in the stream had."""
+        return sorted(self.waiting)
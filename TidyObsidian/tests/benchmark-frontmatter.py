@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared frontmatter parser against the parsers it replaced.
+
+- Builds a throwaway vault of notes with flat, list and nested headers and long bodies.
+- Times the legacy parsers from find-ready-to-publish, sidecar, markdown-corkboard and extract-names-ner, copied here verbatim, next to `frontmatter.py`.
+- Checks the shared parser returns the same dicts as `yaml.safe_load` on every note.
+- Checks that broken headers (an impossible date, an unquoted colon) raise `FrontmatterError` from `read_frontmatter()` and keep their fields through `read_frontmatter_tolerant()`.
+- Checks that `vaultindex.py` indexes every broken note, plus one nested too deep to store as JSON, with its `yaml_error` recorded instead of aborting the run.
+- Run with `python3 tests/benchmark-frontmatter.py --files 5000 --body-lines 200`
+
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import frontmatter  # noqa: E402
+import vaultindex  # noqa: E402
+
+
+def legacy_ready_to_publish(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    yaml_pattern = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+    match = yaml_pattern.search(text)
+    if not match:
+        return {}
+    try:
+        meta = yaml.safe_load(match.group(1))
+        return meta if isinstance(meta, dict) else {}
+    except Exception:
+        return {}
+
+
+def legacy_sidecar(path):
+    metadata = {}
+    with open(path, 'r', encoding='utf-8') as fh:
+        lines = fh.readlines()
+    if not lines or lines[0].strip() != '---':
+        return metadata
+    current_key = None
+    for line in lines[1:]:
+        stripped = line.rstrip('\n')
+        if stripped.strip() == '---':
+            break
+        if stripped.lstrip().startswith('-') and current_key == 'tags':
+            current_value = stripped.lstrip()[1:].strip().strip("'\"")
+            if current_value:
+                metadata.setdefault('tags', [])
+                metadata['tags'].append(current_value)
+            continue
+        if ':' not in stripped:
+            continue
+        key, _, value = stripped.partition(':')
+        key = key.strip()
+        value = value.strip().strip("'\"")
+        if key == 'tags':
+            metadata['tags'] = []
+            current_key = 'tags'
+        else:
+            metadata[key] = value
+            current_key = None
+    return metadata
+
+
+def legacy_corkboard(path):
+    text = Path(path).read_text(encoding='utf-8')
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != '---':
+        return None, None
+    title = description = None
+    i = 1
+    while i < len(lines) and lines[i].strip() != '---':
+        stripped = lines[i].strip()
+        if stripped.startswith('title:') and title is None:
+            title = stripped.split(':', 1)[1].strip().strip('"')
+        elif stripped.startswith('description:') and description is None:
+            description = stripped.split(':', 1)[1].strip().strip('"')
+        i += 1
+    return title, description
+
+
+LEGACY_NER_RE = re.compile(r"\A---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)", re.S)
+
+
+def legacy_ner(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    m = LEGACY_NER_RE.match(text)
+    return m.group(1) if m else None
+
+
+def build_vault(root, files, body_lines, seed):
+    rng = random.Random(seed)
+    words = ['alpha', 'beta', 'gamma', 'delta', 'note', 'task', 'vault', 'draft', 'review', 'idea']
+    for i in range(files):
+        lines = ['---', f'title: Note {i} about {rng.choice(words)}', f'type: {rng.choice(["Article", "Post", "Note"])}',
+                 f'created: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}', 'tags:']
+        lines += [f'  - {rng.choice(words)}' for _ in range(rng.randint(1, 4))]
+        lines.append(f'description: "A short summary of note {i}"')
+        if i % 10 == 0:
+            # Nested mapping and flow list: forces the YAML fallback.
+            lines += ['series:', '  name: Weekly', '  part: 3', f'aliases: [n{i}, note-{i}]']
+        lines.append('---')
+        lines += [' '.join(rng.choice(words) for _ in range(12)) for _ in range(body_lines)]
+        with open(os.path.join(root, f'note-{i:06d}.md'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def time_parser(name, func, paths, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<34} {best * 1000:9.1f} ms  {best / len(paths) * 1e6:8.1f} us/file")
+    return best
+
+
+# Headers the strict parser must reject with FrontmatterError, and what the tolerant one keeps
+BROKEN_HEADERS = [
+    ('type: Podcast\ndate: 2024-02-30\ntitle: Leap day\n',
+     {'type': 'Podcast', 'date': '2024-02-30', 'title': 'Leap day'}),
+    ('type: Podcast\ntitle: Episode 12: The Return\ntags:\n  - podcast\n',
+     {'type': 'Podcast', 'title': 'Episode 12: The Return', 'tags': ['podcast']}),
+]
+
+
+def check_broken_headers(root):
+    """Count broken headers that escape as another exception or lose fields when read tolerantly."""
+    failures = 0
+    for number, (header, expected) in enumerate(BROKEN_HEADERS):
+        path = os.path.join(root, f'broken-{number}.md')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'---\n{header}---\n\nBody\n')
+        try:
+            frontmatter.read_frontmatter(path)
+            failures += 1
+        except frontmatter.FrontmatterError:
+            pass
+        except Exception:
+            failures += 1
+        if frontmatter.read_frontmatter_tolerant(path) != expected:
+            failures += 1
+    return failures
+
+
+# Valid YAML that still cannot be stored: nested deeper than json.dumps recurses
+DEEP_HEADER = 'type: Note\nnested: ' + '[' * 5000 + ']' * 5000 + '\n'
+
+
+def check_index_broken_headers(root):
+    """Count broken notes that vaultindex leaves out of the index or stores without yaml_error."""
+    with open(os.path.join(root, 'deep.md'), 'w', encoding='utf-8') as f:
+        f.write(f'---\n{DEEP_HEADER}---\n\nBody\n')
+    conn = vaultindex.connect(os.path.join(root, 'index.sqlite'))
+    try:
+        vaultindex.update_index(conn, root, workers=2)
+    except Exception as e:
+        print(f"vaultindex aborted: {type(e).__name__}: {e}")
+        return len(BROKEN_HEADERS) + 1
+    errors = {path: error for path, _, _, error in vaultindex.iter_files(conn)}
+    conn.close()
+    names = [f'broken-{number}.md' for number in range(len(BROKEN_HEADERS))] + ['deep.md']
+    return sum(1 for name in names if not errors.get(name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark frontmatter parsers.')
+    parser.add_argument('--files', type=int, default=2000, help='Notes to generate (default: 2000)')
+    parser.add_argument('--body-lines', type=int, default=200, help='Body lines per note (default: 200)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per parser, best is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        build_vault(root, args.files, args.body_lines, args.seed)
+        paths = sorted(os.path.join(root, name) for name in os.listdir(root))
+        with tempfile.TemporaryDirectory() as broken_root:
+            print(f"{len(BROKEN_HEADERS)} broken headers, {check_broken_headers(broken_root)} checks failed, "
+                  f"{check_index_broken_headers(broken_root)} missing a yaml_error in the vault index")
+
+        mismatches = sum(1 for path in paths if frontmatter.read_frontmatter(path) != legacy_ready_to_publish(path))
+        print(f"{len(paths)} notes, {mismatches} differ from yaml.safe_load, "
+              f"C loader: {'yes' if hasattr(yaml, 'CSafeLoader') else 'no'}")
+
+        time_parser('legacy find-ready-to-publish', legacy_ready_to_publish, paths, args.repeat)
+        time_parser('legacy sidecar', legacy_sidecar, paths, args.repeat)
+        time_parser('legacy markdown-corkboard', legacy_corkboard, paths, args.repeat)
+        time_parser('legacy extract-names-ner (split)', legacy_ner, paths, args.repeat)
+        time_parser('read_frontmatter typed', frontmatter.read_frontmatter, paths, args.repeat)
+        time_parser('read_frontmatter typed=False', lambda p: frontmatter.read_frontmatter(p, typed=False),
+                    paths, args.repeat)
+        time_parser('read_header (split)', frontmatter.read_header, paths, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
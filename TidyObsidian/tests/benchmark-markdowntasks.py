@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark task line parsing in markdowntasks.py against the dict-based parser it replaced.
+
+- Generates a reproducible mix of task lines (ids, dependsOn, due, priority, hashtags) and plain lines.
+- Reports per-line parse cost and bytes retained per parsed task (tracemalloc), old and new.
+- Checks both parsers return the same fields for every line.
+- Checks a direct directory scan and `vaultindex.py` read the same tasks from a vault with hidden, `Templates` and `node_modules` folders and a template note, all of which both skip.
+- Run with `python3 tests/benchmark-markdowntasks.py --lines 200000`
+
+"""
+
+import argparse
+import gc
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import vaultindex  # noqa: E402
+from markdowntasks import extract_tasks_from_line, get_tasks_from_directory  # noqa: E402
+
+# Relative path -> whether its task should be read; the skip rules come from vaultscan.py
+WALK_FILES = {
+    'Inbox/note.md': True,
+    'Projects/plan.markdown': True,
+    'Projects/Archive/old.md': True,
+    'Templates/daily.md': False,
+    'Projects/Weekly Template.md': False,
+    '.trash/deleted.md': False,
+    '.obsidian/snippet.md': False,
+    'site/node_modules/readme.md': False,
+}
+
+
+def legacy_extract_tasks_from_line(line):
+    task = {}
+    if line.startswith('- [ ]'):
+        task['status'] = 'todo'
+    elif line.startswith('- [x]'):
+        task['status'] = 'done'
+    else:
+        return None
+    text_match = re.search(r'\] (.*)', line)
+    if not text_match:
+        return None
+    full_text = text_match.group(1).strip()
+    task['text'] = full_text
+    metadata_pattern = re.compile(r'\[(\w+)::\s*([^\]]+)\]')
+    metadata = {}
+    for match in metadata_pattern.finditer(full_text):
+        metadata[match.group(1).lower()] = match.group(2).strip()
+    task['id'] = metadata.get('id')
+    task['priority'] = metadata.get('priority')
+    task['due'] = metadata.get('due')
+    task['created'] = metadata.get('created')
+    task['dependson'] = metadata.get('dependson')
+    tags_pattern = re.compile(r'#(\w+)')
+    tags = [tag.lower() for tag in tags_pattern.findall(full_text)]
+    task['tags'] = tags if tags else []
+    dependencies = []
+    if task.get('dependson'):
+        dependencies = [dep.strip() for dep in task['dependson'].split(',')]
+    task['dependencies'] = dependencies
+    return task
+
+
+def make_lines(count, seed):
+    rng = random.Random(seed)
+    words = 'draft review publish outline record edit schedule email client podcast article'.split()
+    tags = ['Project', 'Goal', 'Podcast', 'Admin', 'Writing']
+    lines = []
+    for i in range(count):
+        if rng.random() < 0.3:
+            lines.append(' '.join(rng.choice(words) for _ in range(12)))
+            continue
+        fields = [f'[id:: {i:06x}]'] if rng.random() < 0.8 else []
+        if i and rng.random() < 0.3:
+            fields.append(f'[dependsOn:: {rng.randrange(i):06x}]')
+        if rng.random() < 0.4:
+            fields.append(f'[due:: 2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}]')
+        if rng.random() < 0.2:
+            fields.append('[priority:: high]')
+        status = 'x' if rng.random() < 0.3 else ' '
+        text = ' '.join(rng.choice(words) for _ in range(6))
+        lines.append(f'- [{status}] #{rng.choice(tags)}, {text} ' + ' '.join(fields))
+    return lines
+
+
+def time_parse(func, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            func(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def retained_bytes(func, lines):
+    gc.collect()
+    tracemalloc.start()
+    parsed = [task for task in map(func, lines) if task]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(parsed), len(parsed)
+
+
+def check_walk_parity(root):
+    """Count task sources the direct scan and the vault index disagree on, or read against the skip rules."""
+    for rel_path in WALK_FILES:
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'# Note\n\n- [ ] Review {rel_path} [id:: {len(rel_path):06d}]\n')
+    expected = {rel_path for rel_path, read in WALK_FILES.items() if read}
+    scanned = {os.path.relpath(task.file, root).replace(os.sep, '/') for task in get_tasks_from_directory(root)}
+    conn = vaultindex.connect(os.path.join(root, '.index.sqlite'))
+    vaultindex.update_index(conn, root, workers=2)
+    indexed = {os.path.relpath(task.file, root).replace(os.sep, '/') for task in vaultindex.load_tasks(conn, root)}
+    conn.close()
+    return len(scanned ^ expected) + len(indexed ^ expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark markdowntasks line parsing.')
+    parser.add_argument('--lines', type=int, default=200000, help='Lines to parse (default: 200000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per parser, best is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines, args.seed)
+    mismatches = 0
+    for line in lines:
+        old, new = legacy_extract_tasks_from_line(line), extract_tasks_from_line(line)
+        if (old is None) != (new is None) or (old and any(
+                list(new[key]) != value if isinstance(value, list) else new[key] != value
+                for key, value in old.items())):
+            mismatches += 1
+    print(f"{len(lines)} lines, {mismatches} parsed differently")
+    with tempfile.TemporaryDirectory() as root:
+        print(f"{len(WALK_FILES)} walk test files, {check_walk_parity(root)} read differently by scan and index")
+
+    for name, func in (('legacy dict', legacy_extract_tasks_from_line), ('Task', extract_tasks_from_line)):
+        seconds = time_parse(func, lines, args.repeat)
+        per_task, tasks = retained_bytes(func, lines)
+        print(f"{name:<12} {seconds / len(lines) * 1e6:7.2f} us/line  {per_task:7.0f} bytes/task  ({tasks} tasks)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark standardize_task_line() in markdown-tasks-quality.py against the version that compiled its patterns per call.
+
+- Generates a reproducible corpus of task lines: open and completed checkboxes, spaced checkboxes like `[ x ]`, tabs and indents, `[key: value]` and `[key:: value]` metadata, and Tasks plugin emojis with and without values.
+- Checks both versions return the same line and modified flag for every line, then reports the cost per line for each.
+- Run with `python3 tests/benchmark-quality.py --lines 200000`
+
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import re
+import sys
+import time
+
+TOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, TOOL_DIR)
+
+
+def load_quality():
+    spec = importlib.util.spec_from_file_location(
+        'markdown_tasks_quality', os.path.join(TOOL_DIR, 'markdown-tasks-quality.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_standardize_task_line(line):
+    match = re.match(r'^([\t ]*[-*]\s*\[ . \]\s*)(.*)', line)
+    if not match:
+        return line, False
+    prefix, body = match.groups()
+    repaired_body = re.sub(r'\[(\w+):\s*([^\]]+)\]', r'[\1:: \2]', body)
+    meta_pattern = re.compile(r'\[(\w+)::\s*([^\]]+)\]')
+    metadata_items = meta_pattern.findall(repaired_body)
+    description_raw = meta_pattern.sub('', repaired_body)
+    emoji_map = {
+        '📅': 'due', '🛫': 'start', '⏳': 'scheduled',
+        '✅': 'completed', '➕': 'created',
+        '⏫': 'priority_high', '🔼': 'priority_medium', '🔽': 'priority_low'
+    }
+    metadata = {k: v.strip() for k, v in metadata_items}
+    for emoji, key in emoji_map.items():
+        if emoji in description_raw:
+            emoji_regex = re.compile(fr'{emoji}\s*([\d\w\-\:]+)?')
+            val_match = emoji_regex.search(description_raw)
+            if val_match and val_match.group(1):
+                metadata[key] = val_match.group(1).strip()
+                description_raw = emoji_regex.sub('', description_raw)
+            else:
+                metadata[key] = 'true'
+                description_raw = description_raw.replace(emoji, '')
+    clean_description = " ".join(description_raw.split()).strip()
+    meta_str = " ".join([f"[{k}:: {v}]" for k, v in metadata.items()])
+    indent_only = re.match(r'^([\t ]*)', prefix).group(1)
+    checkbox = "[ ] " if "[ ]" in prefix else "[x] "
+    standardized_line = f"{indent_only}- {checkbox}{clean_description} {meta_str}".rstrip() + "\n"
+    return standardized_line, standardized_line != line
+
+
+def make_lines(count, seed):
+    rng = random.Random(seed)
+    words = 'draft review publish outline record edit schedule email client podcast article'.split()
+    emojis = ['📅', '🛫', '⏳', '✅', '➕', '⏫', '🔼', '🔽']
+    checkboxes = ['[ ]', '[x]', '[ x ]', '[ / ]', '[ - ]']
+    lines = []
+    for _ in range(count):
+        indent = rng.choice(['', '', '\t', '    ', '\t\t'])
+        marker = rng.choice(['-', '-', '*', '-\t', '-  '])
+        parts = [' '.join(rng.choice(words) for _ in range(rng.randint(2, 8)))]
+        if rng.random() < 0.5:
+            parts.append(f'#{rng.choice(words).title()}')
+        for _ in range(rng.randint(0, 3)):
+            key = rng.choice(['due', 'created', 'priority', 'id'])
+            colons = rng.choice([':: ', ':: ', ': ', '::'])
+            parts.append(f'[{key}{colons}2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}]')
+        for _ in range(rng.choice([0, 0, 0, 1, 2, 3])):
+            emoji = rng.choice(emojis)
+            value = rng.choice(['', ' 2026-03-04', '2026-03-04', ' ', ' soon'])
+            parts.insert(rng.randint(0, len(parts)), emoji + value)
+        lines.append(f'{indent}{marker} {rng.choice(checkboxes)} {"  ".join(parts) if rng.random() < 0.2 else " ".join(parts)}\n')
+    return lines
+
+
+def time_calls(func, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            func(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark standardize_task_line().')
+    parser.add_argument('--lines', type=int, default=200000, help='Task lines to standardize (default: 200000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per version, best is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    quality = load_quality()
+    lines = make_lines(args.lines, args.seed)
+    parsed = sum(1 for line in lines if quality.PREFIX_PATTERN.match(line))
+    mismatches = sum(1 for line in lines if legacy_standardize_task_line(line) != quality.standardize_task_line(line))
+    print(f"{len(lines)} lines ({parsed} past the prefix match), {mismatches} standardized differently")
+
+    for name, func in (('per-call re', legacy_standardize_task_line), ('precompiled', quality.standardize_task_line)):
+        seconds = time_calls(func, lines, args.repeat)
+        print(f"{name:<12} {seconds / len(lines) * 1e6:7.2f} us/line")
+
+
+if __name__ == '__main__':
+    main()
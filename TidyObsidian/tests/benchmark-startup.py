@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Measure CLI startup cost of the TidyObsidian and MarkdownTools scripts.
+
+- Runs each script's `--help` under `python -X importtime` and reports wall time, total import time and the heaviest top-level imports.
+- `--help` should never pay for pandas, NLTK corpora or spell-check dictionaries; those belong in the code paths that use them.
+- Pass `--max-ms 500` to exit non-zero when any script starts slower than that, so a regression fails loudly.
+- Run with `python3 tests/benchmark-startup.py` or `python3 tests/benchmark-startup.py --json --repeat 5`
+
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRIPTS = [
+    'TidyObsidian/find-duplicate-blocks.py',
+    'TidyObsidian/find-ready-to-publish.py',
+    'TidyObsidian/find-similar-filenames.py',
+    'TidyObsidian/find-zettel-duplicates.py',
+    'TidyObsidian/markdown-tasks-extract.py',
+    'TidyObsidian/markdown-tasks-fixid.py',
+    'TidyObsidian/markdown-tasks-quality.py',
+    'TidyObsidian/markdown-tasks-tree.py',
+    'MarkdownTools/extract-hashtag-terms.py',
+    'MarkdownTools/extract-ngram-phrases.py',
+]
+
+# "import time: self [us] | cumulative | imported package", nesting shown by indentation.
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)')
+
+
+def parse_importtime(stderr):
+    """Return [(module, cumulative_us)] for top-level imports, heaviest first."""
+    top = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match and len(match.group(3)) == 1:
+            top.append((match.group(4), int(match.group(2))))
+    return sorted(top, key=lambda item: item[1], reverse=True)
+
+
+def measure(script, repeat):
+    """Best-of-repeat wall time for `script --help`, with its import profile."""
+    path = os.path.join(REPO_DIR, script)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', path, '--help'],
+                              cwd=os.path.dirname(path), capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    imports = parse_importtime(proc.stderr)
+    result = {
+        'script': script,
+        'wall_ms': round(best * 1000, 1),
+        'import_ms': round(sum(us for _, us in imports) / 1000, 1),
+        'heaviest': [{'module': name, 'ms': round(us / 1000, 1)} for name, us in imports[:5]],
+        'exit_code': proc.returncode,
+    }
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith('import time:')]
+        result['error'] = errors[-1] if errors else f'exit code {proc.returncode}'
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure --help startup time of the CLI scripts.')
+    parser.add_argument('scripts', nargs='*', default=SCRIPTS, help='Scripts relative to the repository root (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per script, fastest is reported (default: 3)')
+    parser.add_argument('--max-ms', type=float, default=None, help='Exit 1 if any script takes longer than this')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    results = [measure(script, args.repeat) for script in args.scripts]
+
+    if args.json:
+        print(json.dumps({'python': sys.version.split()[0], 'results': results}, indent=2))
+    else:
+        for result in results:
+            heaviest = ', '.join(f"{item['module']} {item['ms']:.0f}ms" for item in result['heaviest'][:3])
+            status = f"  FAILED: {result['error']}" if result['exit_code'] != 0 else ''
+            print(f"{result['script']:<42} {result['wall_ms']:8.1f} ms  imports {result['import_ms']:7.1f} ms  [{heaviest}]{status}")
+
+    slow = [r for r in results if args.max_ms is not None and r['wall_ms'] > args.max_ms]
+    for result in slow:
+        print(f"Too slow: {result['script']} took {result['wall_ms']} ms (limit {args.max_ms} ms)", file=sys.stderr)
+    sys.exit(1 if slow else 0)
+
+
+if __name__ == '__main__':
+    main()
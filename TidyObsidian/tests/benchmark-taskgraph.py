@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark the task dependency graph in taskgraph.py and the tree builder in markdown-tasks-tree.py.
+
+- Generates a reproducible task list: random dependsOn links to earlier tasks, a few planted cycles, and one long chain deeper than any recursion limit.
+- Times graph construction, Tarjan's SCC, topological order, critical path, urgency scoring (urgency.py), filter indexing and AND/OR queries (taskfilter.py), streaming grouping (taskstream.py) in file order and with every reference forward, DOT/GraphML/JSON-lines export (taskexport.py) to /dev/null, re-ranking a filtered subset, and building plus printing the full dependency tree.
+- Checks that the planted cycles are found, that the order puts every prerequisite first, that dependent counts match a plain traversal for a sample of tasks, and that the whole deep chain reaches the tree.
+- Run with `python3 tests/benchmark-taskgraph.py --tasks 100000`; add `--cycles 2000` to check that many cycles do not slow urgency scoring down.
+
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import sys
+import time
+
+TOOL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, TOOL_DIR)
+from markdowntasks import Task  # noqa: E402
+from taskexport import EXPORT_FORMATS, export_graph  # noqa: E402
+from taskfilter import TaskFilterIndex  # noqa: E402
+from taskgraph import TaskGraph  # noqa: E402
+from taskstream import StreamingTaskGraph  # noqa: E402
+from urgency import UrgencyRanker, dependent_counts  # noqa: E402
+
+
+def load_tree():
+    spec = importlib.util.spec_from_file_location(
+        'markdown_tasks_tree', os.path.join(TOOL_DIR, 'markdown-tasks-tree.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_tasks(count, cycles, chain, seed):
+    rng = random.Random(seed)
+    ids = [f'{i:06x}' for i in range(count)]
+    deps = [[] for _ in range(count)]
+    for i in range(1, count):
+        if rng.random() < 0.6:
+            deps[i] = sorted({ids[rng.randrange(max(0, i - 500), i)] for _ in range(rng.randint(1, 3))})
+    # One long chain at the end, each task depending on the one before
+    for i in range(count - chain + 1, count):
+        deps[i] = [ids[i - 1]]
+    # Planted cycles: an early task depends on a later one in the same window
+    planted = []
+    for _ in range(cycles):
+        i = rng.randrange(1000, count - chain - 1000)
+        deps[i - 1] = [ids[i]]
+        deps[i] = [ids[i - 1]]
+        planted.append(i)
+    tasks = []
+    for i in range(count):
+        status = 'done' if rng.random() < 0.3 else 'todo'
+        tasks.append(Task(status, f'task {ids[i]} #project', ids[i], dependson=','.join(deps[i]) or None,
+                          tags=('project',), dependencies=tuple(deps[i])))
+    return tasks, planted
+
+
+def count_dependents(graph, node):
+    """Tasks waiting on node, by plain traversal, to check dependent_counts()."""
+    seen = {node}
+    stack = [node]
+    while stack:
+        for dependent in graph.dependents[stack.pop()]:
+            if dependent not in seen:
+                seen.add(dependent)
+                stack.append(dependent)
+    return len(seen) - 1
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<26} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the task dependency graph.')
+    parser.add_argument('--tasks', type=int, default=100000, help='Tasks to generate (default: 100000)')
+    parser.add_argument('--cycles', type=int, default=10, help='Two-task cycles to plant (default: 10)')
+    parser.add_argument('--chain', type=int, default=5000, help='Length of the deep dependency chain (default: 5000)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    tasks, planted = make_tasks(args.tasks, args.cycles, args.chain, args.seed)
+    tree = load_tree()
+
+    graph = timed('build graph', lambda: TaskGraph(tasks))
+    timed('strongly connected', graph.strongly_connected_components)
+    found = timed('cycles', graph.cycles)
+    order = timed('topological order', graph.topological_order)
+    length, path = timed('critical path', graph.critical_path)
+    counts = timed('dependent counts', lambda: dependent_counts(graph))
+    ranker = timed('urgency scores', lambda: UrgencyRanker(tasks, graph=graph))
+    subset = tasks[::10]
+    timed(f'rank {len(subset)} filtered', lambda: ranker.rank(subset))
+    index = timed('filter index', lambda: TaskFilterIndex(tasks))
+    timed('filter hashtag AND text', lambda: index.select([('hashtag', 'project'), ('catalog', 'task 00')]))
+    timed('filter text OR text', lambda: index.select([('channel', 'task 01'), ('catalog', 'task 02')], 'any'))
+    timed('filter repeated (cached)', lambda: index.select([('hashtag', 'project'), ('catalog', 'task 00')]))
+
+    def stream(ordered):
+        streaming = StreamingTaskGraph()
+        groups = sum(len(streaming.add(task)) for task in ordered)
+        return groups, groups + len(streaming.finish())
+
+    early, streamed = timed('stream groups', lambda: stream(tasks))
+    _, streamed_back = timed('stream groups, reversed', lambda: stream(reversed(tasks)))
+    print(f"{streamed} groups streamed ({early} before end of input), {streamed_back} reversed")
+    with open(os.devnull, 'w', encoding='utf-8') as null:
+        for fmt in EXPORT_FORMATS:
+            timed(f'export {fmt}', lambda: export_graph(graph, fmt, null))
+
+    def full_tree():
+        all_tasks, reverse_deps = tree.index_tasks(tasks)
+        built = tree.build_dependency_tree(all_tasks, all_tasks, reverse_deps)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            tree.display_tree(*built, max_depth=args.chain + 1, show_prefix=False)
+        return out.getvalue()
+
+    output = timed('tree build + print', full_tree)
+
+    cyclic = {node for component in found for node in component}
+    position = {node: i for i, node in enumerate(order)}
+    misordered = sum(1 for node, prereqs in enumerate(graph.prerequisites) for p in prereqs
+                     if p not in cyclic and node not in cyclic and position[p] > position[node])
+    sample = random.Random(args.seed).sample(range(len(graph)), min(200, len(graph)))
+    wrong_counts = sum(1 for node in sample if count_dependents(graph, node) != counts[node])
+    deepest = max(len(line) - len(line.lstrip(' ')) for line in output.splitlines())
+    print(f"{len(found)} cycles found ({len(planted)} planted), {misordered} edges out of order, "
+          f"critical path {length} open tasks over {len(path)} steps, deepest tree level {deepest}, "
+          f"{wrong_counts} of {len(sample)} sampled dependent counts wrong")
+
+
+if __name__ == '__main__':
+    main()
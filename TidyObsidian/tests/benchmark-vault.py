@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Benchmark the TidyObsidian tools on reproducible synthetic vaults.
+
+- Builds deterministic vaults (same seed, same bytes) with frontmatter, tasks carrying `[id::]` and `[dependsOn::]`, repeated blocks, whole-file copies, hashtags and Zettel serials, some of them duplicated.
+- Runs each tool as its own process and records wall time, throughput and peak RSS (largest single process, pool workers included).
+- Prints one JSON document; keep them to compare a change against its baseline.
+- Run with `python3 tests/benchmark-vault.py --sizes 1000,10000 --out bench.json`, or `--workdir /tmp/bench` to build the vaults once and reuse them.
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: argument list after the script; '{vault}' is replaced by the vault path.
+# Every tool runs with the vault as its working directory (find-duplicate-blocks reads `git ls-files`).
+TOOLS = {
+    'find-duplicate-blocks': ('find-duplicate-blocks.py', []),
+    'markdown-tasks-extract': ('markdown-tasks-extract.py', ['{vault}']),
+    'markdown-tasks-fixid': ('markdown-tasks-fixid.py', ['{vault}', '--fix-id', 'dry']),
+    'markdown-tasks-quality': ('markdown-tasks-quality.py', ['{vault}']),
+    'markdown-tasks-tree': ('markdown-tasks-tree.py', ['{vault}']),
+    'find-ready-to-publish': ('find-ready-to-publish.py', ['{vault}', '--json']),
+    'find-zettel-duplicates': ('find-zettel-duplicates.py', ['{vault}']),
+}
+
+WORDS = (
+    'vault note draft review outline idea research publish archive client project meeting summary '
+    'podcast episode article newsletter reader audience market offer launch weekly process system '
+    'template habit journal insight question answer source quote evidence pattern example'
+).split()
+TAGS = ['Project', 'Goal', 'Article', 'Podcast', 'Research', 'Admin', 'Writing', 'Marketing']
+TYPES = ['Note', 'Note', 'Note', 'Article', 'Post', 'Project', 'Meeting']
+STATUSES = ['S1-Draft', 'S2-Review', 'S3-Edit', 'S4-Ready']
+BLOCK_POOL_SIZE = 64
+BLOCK_LINES = 6
+FILES_PER_FOLDER = 200
+VAULT_MARKER = '.benchmark-vault'
+
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def task_id(n):
+    """Six character base-36 id, unique per n."""
+    digits = string.digits + string.ascii_lowercase
+    out = []
+    for _ in range(6):
+        n, r = divmod(n, 36)
+        out.append(digits[r])
+    return ''.join(reversed(out))
+
+
+def build_note(rng, index, serial, blocks, task_ids):
+    """Return the text of one synthetic note."""
+    doc_type = rng.choice(TYPES)
+    lines = [
+        '---',
+        f'title: {sentence(rng, 5)[:-1]}',
+        f'type: {doc_type}',
+        f'status: {rng.choice(STATUSES)}',
+        f'created: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        'tags:',
+    ]
+    lines += [f'  - {tag.lower()}' for tag in rng.sample(TAGS, rng.randint(1, 3))]
+    if doc_type in ('Article', 'Post') and rng.random() < 0.3:
+        lines.append(f'permalink: /{serial}/')
+    lines += ['---', '', f'# Note {serial}', '']
+
+    # Long-form notes land inside find-ready-to-publish's word window.
+    paragraphs = rng.randint(25, 60) if doc_type in ('Article', 'Post') else rng.randint(2, 10)
+    for _ in range(paragraphs):
+        lines.append(' '.join(sentence(rng) for _ in range(rng.randint(2, 4))))
+        if rng.random() < 0.15:
+            lines[-1] += f' #{rng.choice(TAGS)}'
+        lines.append('')
+
+    if rng.random() < 0.2:
+        lines += blocks[rng.randrange(len(blocks))] + ['']
+
+    task_count = rng.choice([0, 0, 0, 1, 2, 3, 5, 8])
+    if task_count:
+        lines += ['## Tasks', '']
+    for _ in range(task_count):
+        fields = []
+        if rng.random() < 0.85:
+            # Some tasks are left without an id for markdown-tasks-fixid to find.
+            new_id = task_id(len(task_ids) * 7919 + 104729)
+            fields.append(f'[id:: {new_id}]')
+            if task_ids and rng.random() < 0.3:
+                fields.append(f'[dependsOn:: {rng.choice(task_ids[-500:])}]')
+            task_ids.append(new_id)
+        if rng.random() < 0.3:
+            fields.append(f'[priority:: {rng.choice(["highest", "high", "medium", "low"])}]')
+        if rng.random() < 0.4:
+            fields.append(f'[due:: 2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}]')
+        status = 'x' if rng.random() < 0.3 else ' '
+        lines.append(f'- [{status}] #{rng.choice(TAGS)}, {sentence(rng, 6)} ' + ' '.join(fields))
+    return '\n'.join(lines).rstrip() + '\n'
+
+
+def build_vault(root, files, seed):
+    """Write a deterministic vault of `files` notes under root; returns total bytes."""
+    rng = random.Random(seed)
+    blocks = [[sentence(rng, 10) for _ in range(BLOCK_LINES)] for _ in range(BLOCK_POOL_SIZE)]
+    task_ids = []
+    serials = []
+    written = []
+    total_bytes = 0
+    for index in range(files):
+        folder = os.path.join(root, f'Area {index // FILES_PER_FOLDER:04d}')
+        if index % FILES_PER_FOLDER == 0:
+            os.makedirs(folder, exist_ok=True)
+        if serials and rng.random() < 0.01:
+            serial = rng.choice(serials)
+        else:
+            day = index // 9999
+            serial = f'2024{1 + day // 28 % 12:02d}{1 + day % 28:02d}{index % 9999:04d}'
+            serials.append(serial)
+        path = os.path.join(folder, f'{serial} {rng.choice(WORDS)} {rng.choice(WORDS)}.md')
+        if written and rng.random() < 0.005:
+            with open(rng.choice(written), 'r', encoding='utf-8') as f:
+                text = f.read()
+        else:
+            text = build_note(rng, index, serial, blocks, task_ids)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        written.append(path)
+        total_bytes += len(text.encode('utf-8'))
+
+    # find-duplicate-blocks lists files with `git ls-files`.
+    subprocess.run(['git', 'init', '-q'], cwd=root, check=True)
+    subprocess.run(['git', 'add', '-A'], cwd=root, check=True)
+    with open(os.path.join(root, VAULT_MARKER), 'w') as f:
+        json.dump({'files': files, 'seed': seed, 'bytes': total_bytes}, f)
+    return total_bytes
+
+
+def prepare_vault(workdir, files, seed):
+    """Build the vault for (files, seed) unless an identical one is already there."""
+    root = os.path.join(workdir, f'vault-{files}-seed{seed}')
+    marker = os.path.join(root, VAULT_MARKER)
+    if os.path.exists(marker):
+        with open(marker) as f:
+            return root, json.load(f)['bytes'], 0.0
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    start = time.perf_counter()
+    total_bytes = build_vault(root, files, seed)
+    return root, total_bytes, time.perf_counter() - start
+
+
+def run_tool(cmd, cwd, timeout):
+    """Run one process; returns (seconds, peak_rss_bytes, exit_code, stderr_tail)."""
+    env = dict(os.environ)
+    env.pop('TIDYOBSIDIAN_STAT_CACHE', None)
+    with tempfile.TemporaryFile() as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=err)
+        timer = threading.Timer(timeout, proc.kill) if timeout else None
+        if timer:
+            timer.start()
+        # wait4 reports the child's usage including its waited-for workers.
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        if timer:
+            timer.cancel()
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        err.seek(0)
+        tail = err.read()[-2000:].decode('utf-8', errors='replace').strip()
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return elapsed, peak, proc.returncode, tail
+
+
+def benchmark(tool, vault, files, total_bytes, repeat, timeout):
+    script, args = TOOLS[tool]
+    cmd = [sys.executable, os.path.join(TOOLS_DIR, script)] + [arg.replace('{vault}', vault) for arg in args]
+    best = None
+    peak = 0
+    for _ in range(repeat):
+        seconds, rss, code, tail = run_tool(cmd, vault, timeout)
+        peak = max(peak, rss)
+        best = seconds if best is None else min(best, seconds)
+        if code != 0:
+            break
+    ok = code == 0 and best
+    result = {
+        'tool': tool,
+        'files': files,
+        'bytes': total_bytes,
+        'seconds': round(best, 3),
+        'files_per_second': round(files / best, 1) if ok else None,
+        'mb_per_second': round(total_bytes / best / 1e6, 2) if ok else None,
+        'peak_rss_mb': round(peak / 1e6, 1),
+        'exit_code': code,
+    }
+    if code != 0:
+        result['error'] = tail.splitlines()[-1] if tail else f'exit code {code}'
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the TidyObsidian tools on synthetic vaults.')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma separated vault sizes (default: 1000,10000,100000)')
+    parser.add_argument('--tools', default=','.join(TOOLS), help='Comma separated tools to run (default: all)')
+    parser.add_argument('--seed', type=int, default=1, help='Vault generator seed (default: 1)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per tool, fastest is reported (default: 1)')
+    parser.add_argument('--timeout', type=float, default=None, help='Kill a tool after this many seconds')
+    parser.add_argument('--workdir', default=None, help='Keep vaults here and reuse them (default: temporary)')
+    parser.add_argument('--out', default=None, help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    tools = [tool for tool in args.tools.split(',') if tool]
+    unknown = [tool for tool in tools if tool not in TOOLS]
+    if unknown:
+        parser.error(f"unknown tool(s): {', '.join(unknown)}; choose from {', '.join(TOOLS)}")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='tidyobsidian-bench-')
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'results': [],
+    }
+    try:
+        for size in sizes:
+            vault, total_bytes, build_seconds = prepare_vault(workdir, size, args.seed)
+            print(f"Vault {size} files, {total_bytes / 1e6:.1f} MB (built in {build_seconds:.1f}s)", file=sys.stderr)
+            for tool in tools:
+                result = benchmark(tool, vault, size, total_bytes, args.repeat, args.timeout)
+                report['results'].append(result)
+                status = 'ok' if result['exit_code'] == 0 else f"FAILED: {result.get('error')}"
+                print(f"  {tool:<24} {result['seconds']:8.2f}s {result['peak_rss_mb']:8.1f} MB  {status}", file=sys.stderr)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Task Urgency Library
+
+- Ranks markdown tasks by how much work waits on them, how soon they are due, and their `[priority:: ...]`, modelled on the Obsidian Tasks plugin urgency score.
+- Dependent counts are exact (each waiting task counted once) and come from one pass over the dependency graph in reverse topological order with a bitset per component (see `taskgraph.py`), never a traversal per task.
+- Scores are computed once per task list. Ranking a filtered subset is only a sort on stored keys, cheap enough to repeat on every keystroke of a filter.
+
+"""
+
+import math
+from datetime import date
+from functools import lru_cache
+
+from taskgraph import TaskGraph
+
+# Obsidian Tasks plugin priority coefficients; a task without a priority scores as 'none'
+PRIORITY_SCORES = {
+    'highest': 9.0,
+    'high': 6.0,
+    'medium': 3.9,
+    'none': 1.95,
+    'low': 0.0,
+    'lowest': -1.8,
+}
+DUE_WEIGHT = 12.0  # Tasks plugin: 12 at a week overdue, 2.4 from two weeks out
+DEPENDENT_WEIGHT = 2.0  # per doubling of the work waiting on the task
+
+
+@lru_cache(maxsize=4096)
+def parse_due(value):
+    """Date from a `[due:: YYYY-MM-DD]` value, or None when missing or malformed."""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip()[:10])
+    except ValueError:
+        return None
+
+
+def due_score(due, today):
+    """12.0 from a week overdue, sliding down to 2.4 for two weeks or more ahead, 0 without a date."""
+    if due is None:
+        return 0.0
+    days_until = (due - today).days
+    if days_until <= -7:
+        return DUE_WEIGHT
+    if days_until >= 14:
+        return 0.2 * DUE_WEIGHT
+    return (0.2 + 0.8 * (14 - days_until) / 21) * DUE_WEIGHT
+
+
+def priority_score(priority):
+    return PRIORITY_SCORES.get((priority or 'none').strip().lower(), PRIORITY_SCORES['none'])
+
+
+# int.bit_count() is Python 3.10+; counting '1's in bin() is the slower fallback
+popcount = getattr(int, 'bit_count', lambda bits: bin(bits).count('1'))
+
+
+def dependent_counts(graph):
+    """Distinct tasks waiting on each node, directly or through others.
+
+    One pass over the condensed graph (each cycle collapsed to one node) in
+    reverse topological order. Every component keeps the components downstream
+    of it as a Python int bitset, the OR of its dependents' sets. Each component
+    owns a run of bits as long as its task count, so the popcount is the number
+    of tasks downstream, cycles included. A set is dropped as soon as every
+    component upstream of it has used it. Tasks in a cycle all wait on each other.
+    """
+    components = graph.strongly_connected_components()
+    component_of = [0] * len(graph)
+    for number, component in enumerate(components):
+        for node in component:
+            component_of[node] = number
+    dependents = graph.dependents
+    # Dependent components of each component, and how many components will read its set
+    targets = []
+    readers = [0] * len(components)
+    for number, component in enumerate(components):
+        found = {component_of[dependent] for node in component for dependent in dependents[node]}
+        found.discard(number)
+        targets.append(found)
+        for target in found:
+            readers[target] += 1
+    # Bits of each component: one per task, at consecutive positions
+    masks = []
+    offset = 0
+    for component in components:
+        masks.append(((1 << len(component)) - 1) << offset)
+        offset += len(component)
+    downstream = [0] * len(components)
+    totals = [0] * len(components)
+    # Tarjan order lists every component before the ones it depends on
+    for number, component in enumerate(components):
+        bits = 0
+        for target in targets[number]:
+            bits |= downstream[target] | masks[target]
+            readers[target] -= 1
+            if not readers[target]:
+                downstream[target] = 0
+        totals[number] = popcount(bits) + len(component) - 1
+        if readers[number]:
+            downstream[number] = bits
+    return [totals[component_of[node]] for node in range(len(graph))]
+
+
+class UrgencyRanker:
+    """Urgency keys for every task in a list, computed once.
+
+    rank() takes any subset of those tasks (a filter result) and returns it
+    open tasks first, then by descending score, then by text.
+    """
+
+    def __init__(self, tasks, today=None, graph=None):
+        self.graph = graph if graph is not None else TaskGraph(tasks)
+        today = today or date.today()
+        counts = dependent_counts(self.graph)
+        # Vaults reuse a handful of due dates and priorities; score each distinct value once
+        due_scores = {}
+        priority_scores = {}
+        self.scores = {}
+        self.keys = {}
+        for task, count in zip(self.graph.tasks, counts):
+            due = task.get('due')
+            if due not in due_scores:
+                due_scores[due] = due_score(parse_due(due), today)
+            priority = task.get('priority')
+            if priority not in priority_scores:
+                priority_scores[priority] = priority_score(priority)
+            score = due_scores[due] + priority_scores[priority] + DEPENDENT_WEIGHT * math.log2(1 + count)
+            self.scores[id(task)] = score
+            self.keys[id(task)] = (task.get('status') == 'done', -score, task.get('text', ''))
+
+    def score(self, task):
+        return self.scores[id(task)]
+
+    def rank(self, tasks):
+        return sorted(tasks, key=lambda task: self.keys[id(task)])
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Vault Index Library
+
+- Local SQLite index of per-file metadata so tools stop re-reading every note: frontmatter, tasks, tags, wikilinks and content hashes.
+- Updated incrementally. Files with unchanged mtime and size are skipped, a changed mtime with identical SHA-256 only refreshes the stat.
+- Run directly to refresh the index in a nightly job, `python3 vaultindex.py /workspaces/obsidian --db /tmp/vault.sqlite`
+
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+
+from frontmatter import FrontmatterError, parse_frontmatter, parse_lines, split_frontmatter
+from markdowntasks import Task, extract_tasks_from_line
+from vaultscan import MARKDOWN_EXTENSIONS, iter_vault
+
+INDEX_VERSION = '3'
+HASHTAG_PATTERN = re.compile(r'(?:^|\s)#([A-Za-z0-9-_]+)')
+WIKILINK_PATTERN = re.compile(r'\[\[([^\]|#]+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    sha256 TEXT,
+    frontmatter TEXT,
+    yaml_error TEXT,
+    type TEXT,
+    permalink TEXT,
+    word_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_type ON files(type);
+CREATE INDEX IF NOT EXISTS files_permalink ON files(permalink);
+CREATE TABLE IF NOT EXISTS tasks (
+    path TEXT,
+    line INTEGER,
+    status TEXT,
+    text TEXT,
+    task_id TEXT,
+    dependson TEXT,
+    priority TEXT,
+    due TEXT,
+    created TEXT,
+    tags TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_path ON tasks(path);
+CREATE INDEX IF NOT EXISTS tasks_id ON tasks(task_id);
+CREATE TABLE IF NOT EXISTS tags (
+    path TEXT,
+    tag TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS tags_path ON tags(path);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags(tag);
+CREATE TABLE IF NOT EXISTS links (
+    path TEXT,
+    target TEXT
+);
+CREATE INDEX IF NOT EXISTS links_path ON links(path);
+CREATE INDEX IF NOT EXISTS links_target ON links(target);
+"""
+
+
+def first_value(value, default=''):
+    """Frontmatter fields may be lists; take the first element as a string."""
+    if isinstance(value, list):
+        value = value[0] if value else default
+    return str(value) if value is not None else default
+
+
+def parse_note(rel_path, content):
+    """Parse one note into the rows stored for it.
+
+    Returns a dict with frontmatter, yaml_error, word_count, tasks, tags and links.
+    """
+    yaml_error = None
+    header, body = split_frontmatter(content)
+    try:
+        meta = parse_frontmatter(header)
+        frontmatter_json = json.dumps(meta, default=str)
+    except (FrontmatterError, ValueError, TypeError, RecursionError) as e:
+        # Keep the fields the old line-based readers found, so type and permalink
+        # lookups match a direct scan; the error is still recorded. RecursionError
+        # covers YAML nested too deep to store as JSON
+        yaml_error = str(e) or type(e).__name__
+        meta = parse_lines(header)
+        frontmatter_json = json.dumps(meta)
+
+    tags = []
+    yaml_tags = meta.get('tags')
+    if yaml_tags:
+        for tag in yaml_tags if isinstance(yaml_tags, list) else [yaml_tags]:
+            tags.append((str(tag), 'yaml'))
+    for tag in HASHTAG_PATTERN.findall(body):
+        tags.append((tag, 'body'))
+
+    tasks = []
+    for line_no, line in enumerate(content.splitlines(), 1):
+        task = extract_tasks_from_line(line.strip())
+        if task:
+            tasks.append((
+                line_no, task['status'], task['text'], task['id'], task['dependson'],
+                task['priority'], task['due'], task['created'], ' '.join(task['tags']),
+            ))
+
+    links = sorted({target.strip() for target in WIKILINK_PATTERN.findall(body) if target.strip()})
+
+    return {
+        'frontmatter': frontmatter_json,
+        'yaml_error': yaml_error,
+        'type': first_value(meta.get('type')).strip().lower(),
+        'permalink': first_value(meta.get('permalink')).strip() or None,
+        'word_count': len(body.split()),
+        'tasks': tasks,
+        'tags': tags,
+        'links': links,
+    }
+
+
+def read_and_parse(args):
+    """Worker: read a changed file, hash it, and parse it unless the hash is unchanged."""
+    rel_path, full_path, known_sha = args
+    try:
+        with open(full_path, 'rb') as f:
+            raw = f.read()
+    except OSError as e:
+        print(f"Error reading file {full_path}: {e}", file=sys.stderr)
+        return rel_path, None, None
+    sha = hashlib.sha256(raw).hexdigest()
+    if sha == known_sha:
+        return rel_path, sha, None
+    try:
+        note = parse_note(rel_path, raw.decode('utf-8', errors='ignore'))
+    except Exception as e:
+        # One note the parser cannot handle must not abort the whole run in the pool;
+        # index it without rows and keep the error in yaml_error
+        print(f"Error parsing file {full_path}: {e}", file=sys.stderr)
+        note = {'frontmatter': '{}', 'yaml_error': f'{type(e).__name__}: {e}', 'type': '', 'permalink': None,
+                'word_count': 0, 'tasks': [], 'tags': [], 'links': []}
+    return rel_path, sha, note
+
+
+def connect(db_path):
+    """Open the index database and make sure the schema exists."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def delete_file_rows(conn, rel_path, keep_file_row=False):
+    """Remove every row owned by a file."""
+    for table in ('tasks', 'tags', 'links'):
+        conn.execute(f"DELETE FROM {table} WHERE path = ?", (rel_path,))
+    if not keep_file_row:
+        conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+
+
+def update_index(conn, root, extensions=MARKDOWN_EXTENSIONS, workers=None):
+    """Bring the index in line with the vault. Returns (parsed, removed) counts."""
+    root_key = os.path.abspath(root)
+    stored_root = conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+    stored_version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    if (stored_root and stored_root[0] != root_key) or (stored_version and stored_version[0] != INDEX_VERSION):
+        # Index was built for another vault or format; start over.
+        for table in ('files', 'tasks', 'tags', 'links'):
+            conn.execute(f"DELETE FROM {table}")
+
+    known = {
+        row['path']: (row['mtime_ns'], row['size'], row['sha256'])
+        for row in conn.execute("SELECT path, mtime_ns, size, sha256 FROM files")
+    }
+
+    seen = set()
+    stale = []
+    stats = {}
+    for full_path, st in iter_vault(root, extensions=extensions, restat=True):
+        rel_path = os.path.relpath(full_path, root).replace(os.sep, '/')
+        seen.add(rel_path)
+        stats[rel_path] = (st.st_mtime_ns, st.st_size)
+        old = known.get(rel_path)
+        if old is None or old[:2] != stats[rel_path]:
+            stale.append((rel_path, full_path, old[2] if old else None))
+
+    parsed = 0
+    with conn:
+        if stale:
+            worker_count = workers or multiprocessing.cpu_count()
+            chunksize = max(1, len(stale) // (worker_count * 8))
+            with multiprocessing.Pool(worker_count) as pool:
+                for rel_path, sha, note in pool.imap_unordered(read_and_parse, stale, chunksize=chunksize):
+                    if sha is None:
+                        continue
+                    mtime_ns, size = stats[rel_path]
+                    if note is None:
+                        # Touched but byte-identical: keep the parsed rows.
+                        conn.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                                     (mtime_ns, size, rel_path))
+                        continue
+                    delete_file_rows(conn, rel_path)
+                    conn.execute(
+                        "INSERT INTO files (path, mtime_ns, size, sha256, frontmatter, yaml_error, type, permalink, word_count)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (rel_path, mtime_ns, size, sha, note['frontmatter'], note['yaml_error'],
+                         note['type'], note['permalink'], note['word_count']),
+                    )
+                    conn.executemany(
+                        "INSERT INTO tasks (path, line, status, text, task_id, dependson, priority, due, created, tags)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(rel_path,) + task for task in note['tasks']],
+                    )
+                    conn.executemany("INSERT INTO tags (path, tag, source) VALUES (?, ?, ?)",
+                                     [(rel_path, tag, source) for tag, source in note['tags']])
+                    conn.executemany("INSERT INTO links (path, target) VALUES (?, ?)",
+                                     [(rel_path, target) for target in note['links']])
+                    parsed += 1
+
+        removed = [path for path in known if path not in seen]
+        for rel_path in removed:
+            delete_file_rows(conn, rel_path)
+
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('root', ?)", (root_key,))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (INDEX_VERSION,))
+
+    return parsed, len(removed)
+
+
+def open_index(db_path, root, update=True):
+    """Open the index for a vault root, refreshing it first unless update=False."""
+    conn = connect(db_path)
+    if update:
+        update_index(conn, root)
+    return conn
+
+
+def iter_files(conn):
+    """Yield (rel_path, frontmatter_dict, word_count, yaml_error) for every indexed file."""
+    for row in conn.execute("SELECT path, frontmatter, word_count, yaml_error FROM files ORDER BY path"):
+        yield row['path'], json.loads(row['frontmatter'] or '{}'), row['word_count'], row['yaml_error']
+
+
+def files_of_type(conn, doc_type):
+    """Yield (rel_path, frontmatter_dict) for files whose first `type` matches (case-insensitive)."""
+    for row in conn.execute("SELECT path, frontmatter FROM files WHERE type = ? ORDER BY path",
+                            (doc_type.lower(),)):
+        yield row['path'], json.loads(row['frontmatter'] or '{}')
+
+
+def find_by_permalink(conn, permalink):
+    """Relative path of the first file with this permalink, or None."""
+    row = conn.execute("SELECT path FROM files WHERE permalink = ? ORDER BY path LIMIT 1",
+                       (permalink,)).fetchone()
+    return row['path'] if row else None
+
+
+def iter_tags(conn, paths=None):
+    """Yield (rel_path, tag, source) where source is 'yaml' or 'body'."""
+    query = "SELECT path, tag, source FROM tags ORDER BY path, rowid"
+    for row in conn.execute(query):
+        if paths is None or row['path'] in paths:
+            yield row['path'], row['tag'], row['source']
+
+
+def load_tasks(conn, root):
+    """Rebuild markdowntasks.Task records from the index."""
+    tasks = []
+    for row in conn.execute("SELECT * FROM tasks ORDER BY path, line"):
+        dependson = row['dependson']
+        task = Task(
+            row['status'], row['text'], row['task_id'], row['priority'], row['due'], row['created'], dependson,
+            tuple(row['tags'].split()) if row['tags'] else (),
+            tuple(dep.strip() for dep in dependson.split(',')) if dependson else (),
+        )
+        task.file = os.path.join(root, row['path'])
+        tasks.append(task)
+    return tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or refresh the SQLite vault metadata index.')
+    parser.add_argument('directory', nargs='?', default='.', help='Vault directory (default: current)')
+    parser.add_argument('--db', required=True, help='Path to the SQLite index file')
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    parsed, removed = update_index(conn, args.directory)
+    total = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+    print(f"Indexed {total} files ({parsed} parsed, {removed} removed).", file=sys.stderr)
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
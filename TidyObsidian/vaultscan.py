@@ -0,0 +1,154 @@
+"""
+Vault Scanner Library
+
+- One directory walk for the TidyObsidian tools, built on `os.scandir`, with the same pruning everywhere.
+- Skips hidden directories and files, `Templates` and `node_modules` directories, and files named like templates.
+- Optional stat cache. Set `TIDYOBSIDIAN_STAT_CACHE=/path/to/file` so repeated tool runs in a pipeline skip re-listing directories whose mtime has not changed. A full walk drops directories under its root that it no longer reaches.
+
+"""
+
+import os
+import pickle
+import stat
+
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+PRUNED_DIRS = {'Templates', 'node_modules'}
+STAT_CACHE_ENV = 'TIDYOBSIDIAN_STAT_CACHE'
+STAT_CACHE_VERSION = 1
+
+
+def is_pruned_dir(name, skip_templates=True):
+    """True for directories no tool should descend into."""
+    if name.startswith('.'):
+        return True
+    return skip_templates and name in PRUNED_DIRS
+
+
+def is_wanted_file(name, extensions=MARKDOWN_EXTENSIONS, skip_templates=True):
+    """True for files a tool should process (extensions=None accepts any type)."""
+    if name.startswith('.'):
+        return False
+    if skip_templates and 'Template' in name:
+        return False
+    return extensions is None or name.lower().endswith(extensions)
+
+
+def load_stat_cache(cache_path):
+    """Load {abs_dir: (dir_mtime_ns, [(name, is_dir, stat_result)])} or an empty dict."""
+    if not cache_path:
+        return {}
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+    except Exception:
+        return {}
+    if cache.get('version') != STAT_CACHE_VERSION:
+        return {}
+    return cache.get('dirs', {})
+
+
+def save_stat_cache(cache_path, dirs):
+    """Write the stat cache atomically; concurrent tools each use their own temp file."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': STAT_CACHE_VERSION, 'dirs': dirs}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def list_directory(dirpath):
+    """List one directory as [(name, is_dir, stat_result)], stat None for directories."""
+    listing = []
+    with os.scandir(dirpath) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    listing.append((entry.name, True, None))
+                elif entry.is_file():
+                    listing.append((entry.name, False, entry.stat()))
+            except OSError:
+                continue
+    return listing
+
+
+def iter_vault(root, extensions=MARKDOWN_EXTENSIONS, skip_templates=True, cache_path=None, restat=False):
+    """Yield (path, stat_result) for every wanted file under root.
+
+    Paths are joined onto root as given, like `os.walk`. With a stat cache, a
+    directory whose mtime is unchanged is not re-listed and its file stats come
+    from the cache; pass restat=True to re-stat those files (needed when file
+    contents matter, since in-place edits do not touch the directory mtime).
+    """
+    if cache_path is None:
+        cache_path = os.environ.get(STAT_CACHE_ENV)
+    cached = load_stat_cache(cache_path)
+    visited = {}
+    complete = False
+
+    try:
+        stack = [root]
+        while stack:
+            dirpath = stack.pop()
+            key = os.path.abspath(dirpath)
+            try:
+                dir_mtime = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+
+            hit = cached.get(key)
+            from_cache = hit is not None and hit[0] == dir_mtime
+            if from_cache:
+                listing = hit[1]
+            else:
+                try:
+                    listing = list_directory(dirpath)
+                except OSError:
+                    continue
+            if cache_path:
+                visited[key] = (dir_mtime, listing)
+
+            subdirs = []
+            for name, is_dir, st in listing:
+                if is_dir:
+                    if not is_pruned_dir(name, skip_templates):
+                        subdirs.append(os.path.join(dirpath, name))
+                elif is_wanted_file(name, extensions, skip_templates):
+                    path = os.path.join(dirpath, name)
+                    if restat and from_cache:
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            continue
+                        if not stat.S_ISREG(st.st_mode):
+                            continue
+                    yield path, st
+
+            # Reverse so directories are visited in listing order.
+            stack.extend(reversed(subdirs))
+        complete = True
+    finally:
+        if cache_path and visited:
+            if complete:
+                # Directories under root that the walk no longer reaches were deleted,
+                # renamed or pruned; drop them so the cache does not grow forever.
+                # Other roots sharing the cache file, and walks stopped early, keep theirs
+                prefix = os.path.join(os.path.abspath(root), '')
+                cached = {key: value for key, value in cached.items()
+                          if not (key + os.sep).startswith(prefix)}
+            cached.update(visited)
+            save_stat_cache(cache_path, cached)
+
+
+def scan_vault(root, extensions=MARKDOWN_EXTENSIONS, skip_templates=True, cache_path=None, restat=False):
+    """List (path, stat_result) for every wanted file under root."""
+    return list(iter_vault(root, extensions, skip_templates, cache_path, restat))
+
+
+def markdown_files(root, extensions=MARKDOWN_EXTENSIONS, skip_templates=True, cache_path=None):
+    """List the paths of every wanted file under root."""
+    return [path for path, _ in iter_vault(root, extensions, skip_templates, cache_path)]
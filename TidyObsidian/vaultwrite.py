@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Vault Write Library
+
+- Crash-safe rewrites for the tools that fix notes in place. Data goes to a temp file next to the note, is fsynced, then renamed over it, so a note is never left half-written.
+- A symlinked note is rewritten at its target, so the link survives. The new file keeps the note's mode, and its owner and group where the user may set them.
+- Content that is byte-identical to the note on disk is not written at all, so Obsidian Sync only sees notes that really changed.
+- Optional batch directory. Workers stage their changes and a manifest; the run is committed in one step at the end, and can be rolled back as a unit afterwards.
+- Run directly to finish an interrupted batch or undo one, `python3 vaultwrite.py rollback /tmp/fixid-batch`
+
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+
+MANIFEST = 'manifest.json'
+
+
+def fsync_dir(path):
+    """Make a rename in this directory durable (no-op where directories cannot be opened)."""
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_bytes(path):
+    """Current content of path, or None if it does not exist."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_temp(path, data, suffix):
+    """Write data to a hidden, fsynced temp file beside path and return its name.
+
+    The temp file takes path's mode and, where permitted, its owner and group.
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{suffix}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        st = os.stat(path)
+    except OSError:
+        return tmp_path
+    try:
+        os.chmod(tmp_path, st.st_mode & 0o7777)
+    except OSError:
+        pass
+    if hasattr(os, 'chown'):
+        try:
+            os.chown(tmp_path, st.st_uid, st.st_gid)
+        except OSError:
+            # Only root may give a file away; a user can still set one of their own groups
+            try:
+                os.chown(tmp_path, -1, st.st_gid)
+            except OSError:
+                pass
+    return tmp_path
+
+
+def atomic_write(path, data):
+    """Replace path with data via temp file, fsync and rename. False if content was already identical."""
+    path = os.path.realpath(path)  # rename over a symlink's target, not the link
+    if read_bytes(path) == data:
+        return False
+    tmp_path = write_temp(path, data, os.getpid())
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+    fsync_dir(os.path.dirname(path))
+    return True
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest() if data is not None else None
+
+
+def new_batch(batch_dir):
+    """Create an empty batch directory; refuse one that already holds a batch."""
+    os.makedirs(batch_dir, exist_ok=True)
+    if os.listdir(batch_dir):
+        raise FileExistsError(f"Batch directory is not empty: {batch_dir}")
+
+
+def stage_file(batch_dir, path, data):
+    """Stage a rewrite of path in a batch instead of writing it. False if content is identical.
+
+    Safe to call from pool workers: every note gets its own entry file, and
+    the batch is assembled by commit_batch().
+    """
+    path = os.path.realpath(path)  # stage the symlink's target, so the commit keeps the link
+    original = read_bytes(path)
+    if original == data:
+        return False
+    key = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+    for sub in ('originals', 'entries'):
+        os.makedirs(os.path.join(batch_dir, sub), exist_ok=True)
+    original_path = os.path.join(batch_dir, 'originals', key)
+    with open(original_path, 'wb') as f:
+        f.write(original or b'')
+        f.flush()
+        os.fsync(f.fileno())
+    entry = {
+        'path': path,
+        'temp': write_temp(path, data, f"batch-{key}"),
+        'original': original_path,
+        'before': sha256(original),
+        'after': sha256(data),
+    }
+    entry_path = os.path.join(batch_dir, 'entries', f"{key}.json")
+    with open(entry_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(entry_path + '.tmp', entry_path)
+    return True
+
+
+def save_manifest(batch_dir, manifest):
+    path = os.path.join(batch_dir, MANIFEST)
+    atomic_write(path, json.dumps(manifest, indent=2).encode('utf-8'))
+
+
+def load_manifest(batch_dir):
+    """The batch manifest, or one assembled from staged entries if it was never committed."""
+    path = os.path.join(batch_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    entries = []
+    for entry_path in sorted(glob.glob(os.path.join(batch_dir, 'entries', '*.json'))):
+        with open(entry_path, encoding='utf-8') as f:
+            entries.append(json.load(f))
+    entries.sort(key=lambda entry: entry['path'])
+    return {'state': 'staged', 'files': entries}
+
+
+def remove_temp(entry):
+    try:
+        os.remove(entry['temp'])
+    except FileNotFoundError:
+        pass
+
+
+def commit_batch(batch_dir):
+    """Rename every staged note into place. Returns (committed, conflicts) as lists of paths.
+
+    A note edited since it was staged is left alone and listed as a conflict.
+    Running it again after a crash finishes the remaining renames.
+    """
+    manifest = load_manifest(batch_dir)
+    if manifest['state'] in ('committed', 'rolled-back'):
+        return [], []
+    manifest['state'] = 'committing'
+    save_manifest(batch_dir, manifest)
+    committed = []
+    conflicts = []
+    for entry in manifest['files']:
+        if entry.get('status') in ('committed', 'conflict'):
+            continue
+        # Entries hold resolved paths; resolving again keeps a link created since staging
+        path = os.path.realpath(entry['path'])
+        current = sha256(read_bytes(path))
+        if current == entry['after']:
+            remove_temp(entry)
+            entry['status'] = 'committed'
+        elif current != entry['before'] or not os.path.exists(entry['temp']):
+            print(f"Changed since staged, left alone: {entry['path']}", file=sys.stderr)
+            remove_temp(entry)
+            entry['status'] = 'conflict'
+            conflicts.append(entry['path'])
+            continue
+        else:
+            os.replace(entry['temp'], path)
+            fsync_dir(os.path.dirname(path))
+            entry['status'] = 'committed'
+        committed.append(entry['path'])
+    manifest['state'] = 'committed'
+    save_manifest(batch_dir, manifest)
+    return committed, conflicts
+
+
+def rollback_batch(batch_dir):
+    """Restore every note the batch changed, unless edited since. Returns (restored, conflicts)."""
+    manifest = load_manifest(batch_dir)
+    if manifest['state'] == 'rolled-back':
+        return 0, 0
+    restored = conflicts = 0
+    for entry in manifest['files']:
+        remove_temp(entry)
+        if entry.get('status') == 'conflict':
+            continue
+        current = sha256(read_bytes(entry['path']))
+        if current == entry['before']:
+            continue
+        if current != entry['after']:
+            print(f"Changed since committed, left alone: {entry['path']}", file=sys.stderr)
+            conflicts += 1
+            continue
+        with open(entry['original'], 'rb') as f:
+            atomic_write(entry['path'], f.read())
+        entry['status'] = 'rolled-back'
+        restored += 1
+    manifest['state'] = 'rolled-back'
+    save_manifest(batch_dir, manifest)
+    return restored, conflicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Commit or roll back a staged batch of note rewrites.')
+    parser.add_argument('action', choices=['commit', 'rollback', 'status'], help='What to do with the batch')
+    parser.add_argument('batch', help='Batch directory given to --batch')
+    args = parser.parse_args()
+
+    if args.action == 'status':
+        manifest = load_manifest(args.batch)
+        print(f"{manifest['state']}: {len(manifest['files'])} files", file=sys.stderr)
+        for entry in manifest['files']:
+            print(f"{entry.get('status', 'staged'):<12} {entry['path']}")
+    elif args.action == 'commit':
+        committed, conflicts = commit_batch(args.batch)
+        print(f"Committed {len(committed)} files ({len(conflicts)} conflicts).", file=sys.stderr)
+    else:
+        restored, conflicts = rollback_batch(args.batch)
+        print(f"Restored {restored} files ({conflicts} conflicts).", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
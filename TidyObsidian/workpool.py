@@ -0,0 +1,195 @@
+"""
+Work Pool Library
+
+- Size-aware scheduling of per-file work over a `multiprocessing.Pool` for the task tools.
+- Largest files are handed out first (longest-processing-time first); small files are grouped into units of similar total size so IPC stays cheap.
+- Idle workers pull the next unit (`imap_unordered`), so one worker stuck on a huge daily log no longer holds up the rest.
+- Streaming callers use `imap_chunked()` instead: contiguous chunks in input order, cut while a directory walk is still running and collected with `imap`, so the first results arrive after the first chunk rather than after the whole run. LPT order is only for callers that collect everything anyway.
+- Optional per-worker utilisation report on stderr: files, bytes, busy time and share of wall time.
+
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+
+UNITS_PER_WORKER = 8  # work units per worker; more units balance better, fewer cost less IPC
+CHUNK_BYTES = 1 << 20  # bytes per contiguous chunk for streaming callers
+
+_unit_func = None
+
+
+def file_size(path):
+    """Size in bytes of a path, 0 when it cannot be stat'ed."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def file_sizes(paths):
+    """Size in bytes of each path, 0 when it cannot be stat'ed."""
+    return [file_size(path) for path in paths]
+
+
+def plan_units(sizes, workers):
+    """Group item indexes into work units, largest first.
+
+    Items at least as large as the unit target get a unit of their own;
+    smaller ones are packed together until the unit reaches the target.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True)
+    target = max(1, sum(sizes) / max(1, workers * UNITS_PER_WORKER))
+    units = []
+    current = []
+    current_bytes = 0
+    for index in order:
+        current.append(index)
+        current_bytes += sizes[index]
+        if current_bytes >= target:
+            units.append(current)
+            current = []
+            current_bytes = 0
+    if current:
+        units.append(current)
+    return units
+
+
+def _init_unit_worker(func):
+    global _unit_func
+    _unit_func = func
+
+
+def _run_unit(unit):
+    """Pool worker: run the function over one unit and time it."""
+    start = time.perf_counter()
+    results = [(index, _unit_func(item)) for index, item in unit]
+    return os.getpid(), time.perf_counter() - start, results
+
+
+def report_utilisation(stats, wall_seconds, label='workers'):
+    """Print per-worker files, bytes, busy time and utilisation to stderr."""
+    if not stats or wall_seconds <= 0:
+        return
+    busy = [worker['busy'] for worker in stats.values()]
+    print(f"--- Utilisation ({len(stats)} {label}, {wall_seconds:.2f}s wall, "
+          f"busiest/mean {max(busy) / (sum(busy) / len(busy)):.2f}) ---", file=sys.stderr)
+    for number, (pid, worker) in enumerate(sorted(stats.items()), 1):
+        print(f"  worker {number} (pid {pid}): {worker['items']} files, {worker['bytes'] / 1e6:.1f} MB, "
+              f"busy {worker['busy']:.2f}s ({100 * worker['busy'] / wall_seconds:.0f}%)", file=sys.stderr)
+
+
+def imap_sized(func, items, sizes=None, workers=None, report=False):
+    """Yield (index, func(item)) for every item, in completion order, largest items first.
+
+    Needs the whole item list before it starts; for callers that collect every
+    result. Streaming callers want imap_chunked().
+
+    func must be picklable (a module-level function or a functools.partial
+    of one). sizes defaults to the file size of each item. With one worker
+    the work runs in this process, without a pool.
+    """
+    items = list(items)
+    if not items:
+        return
+    if sizes is None:
+        sizes = file_sizes(items)
+    workers = workers or multiprocessing.cpu_count()
+    units = [[(index, items[index]) for index in unit] for unit in plan_units(sizes, workers)]
+
+    stats = defaultdict(lambda: {'items': 0, 'bytes': 0, 'busy': 0.0})
+    start = time.perf_counter()
+    if workers <= 1 or len(units) == 1:
+        _init_unit_worker(func)
+        outputs = map(_run_unit, units)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(min(workers, len(units)), initializer=_init_unit_worker, initargs=(func,))
+        outputs = pool.imap_unordered(_run_unit, units)
+    try:
+        for pid, busy, results in outputs:
+            worker = stats[pid]
+            worker['busy'] += busy
+            for index, result in results:
+                worker['items'] += 1
+                worker['bytes'] += sizes[index]
+                yield index, result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    if report:
+        report_utilisation(stats, time.perf_counter() - start)
+
+
+def imap_sized_ordered(func, items, sizes=None, workers=None, report=False):
+    """Yield func(item) in input order, each as soon as every earlier item is done.
+
+    Small early items usually finish last under LPT order, so little is yielded
+    before the end; map_sized() builds on this.
+    """
+    pending = {}
+    next_index = 0
+    for index, result in imap_sized(func, items, sizes, workers, report):
+        pending[index] = result
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+
+
+def map_sized(func, items, sizes=None, workers=None, report=False):
+    """List of func(item) in input order."""
+    return list(imap_sized_ordered(func, items, sizes, workers, report))
+
+
+def imap_chunked(func, items, sizes=None, workers=None, report=False, chunk_bytes=CHUNK_BYTES):
+    """Yield func(item) in input order, streaming.
+
+    items may be a generator, such as a directory walk. It is cut into
+    contiguous chunks of about chunk_bytes as it is read, and the chunks are
+    collected with imap, so each chunk is yielded as soon as it and every
+    earlier chunk are done. sizes defaults to the file size of each item.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    seen_sizes = []
+
+    def chunks():
+        chunk = []
+        chunk_total = 0
+        for index, item in enumerate(items):
+            size = sizes[index] if sizes is not None else file_size(item)
+            seen_sizes.append(size)
+            chunk.append((index, item))
+            chunk_total += size
+            if chunk_total >= chunk_bytes:
+                yield chunk
+                chunk = []
+                chunk_total = 0
+        if chunk:
+            yield chunk
+
+    stats = defaultdict(lambda: {'items': 0, 'bytes': 0, 'busy': 0.0})
+    start = time.perf_counter()
+    if workers <= 1:
+        _init_unit_worker(func)
+        outputs = map(_run_unit, chunks())
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_unit_worker, initargs=(func,))
+        outputs = pool.imap(_run_unit, chunks())
+    try:
+        for pid, busy, results in outputs:
+            worker = stats[pid]
+            worker['busy'] += busy
+            for index, result in results:
+                worker['items'] += 1
+                worker['bytes'] += seen_sizes[index]
+                yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    if report:
+        report_utilisation(stats, time.perf_counter() - start)